@@ -0,0 +1,131 @@
+"""
+OFFLINE LATENCY BENCHMARK OF THE TRADING BOT: trading_bot.main() RUNS AGAINST THE LOCAL MOCK SERVER
+(NO GECKOTERMINAL, JUPITER OR MAINNET CALLS, THROWAWAY WALLET, ALWAYS-BUY MODEL) AND THE TIME SPENT
+IN EVERY PIPELINE STAGE AND API CALL IS REPORTED, TOGETHER WITH THE DETECTION-TO-SEND LATENCY
+
+Run:  python bench_bot.py --duration 60 --latency 80 --jitter 20 --error-rate 0.02
+"""
+
+import argparse
+import base64
+import contextlib
+import functools
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+from solders.keypair import Keypair
+from mock_server import start_mock_server, mock_urls, add_mock_arguments, mock_settings, print_mock_stats
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(ROOT, "trading"))
+sys.path.append(os.path.join(ROOT, "common"))
+
+# Pipeline stages and the calls made inside them (functions of trading_bot)
+STAGES = ["enrich_candidate", "score_candidate", "execute_candidate"]
+CALLS = ["fetch_new_pools", "fetch_pool_data", "fetch_token_info", "prefetch_buy", "get_sol_balance",
+         "get_jupiter_quote", "build_jupiter_swap", "execute_swap"]
+
+timings = {}         # name -> durations (seconds)
+timings_lock = threading.Lock()
+
+def record(name, seconds):
+    with timings_lock:
+        timings.setdefault(name, []).append(seconds)
+
+# Replace a function of the bot module with a timed wrapper (looked up by name at call time)
+def time_function(module, name):
+    function = getattr(module, name)
+
+    @functools.wraps(function)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - start)
+            # Detection-to-send: the execute stage returns once the buy tx is sent
+            if name == "execute_candidate":
+                record("detection_to_send", time.time() - args[0]["detected_at"])
+
+    setattr(module, name, timed)
+
+# Single-leaf forest that buys every candidate, as a memory-mapped artifact (the model itself is
+# benchmarked by flat_forest.py and model_artifact.py)
+def write_always_buy_model(directory, feature_names):
+    from flat_forest import FlatForest
+    from model_artifact import save_mapped
+    save_mapped(FlatForest({
+        "feature": np.zeros(1, dtype=np.intp), "threshold": np.zeros(1), "left": np.zeros(1, dtype=np.intp),
+        "right": np.zeros(1, dtype=np.intp), "missing_left": np.zeros(1, dtype=bool),
+        "value": np.array([[0.0, 1.0]]), "roots": np.zeros(1, dtype=np.intp), "classes": np.array([0, 1]),
+        "feature_names": np.array(feature_names, dtype=str), "max_depth": 0,
+    }), directory, data_hash="bench")
+
+# p50 / p95 / p99 / max (ms) of every timed name
+def print_timings(names, duration):
+    print(f"\n{'':<20} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name in names:
+        values = np.array(timings.get(name, [])) * 1000
+        if not len(values):
+            print(f"{name:<20} {0:>7}")
+            continue
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        print(f"{name:<20} {len(values):>7} {p50:>9.1f} {p95:>9.1f} {p99:>9.1f} {values.max():>9.1f}")
+    sent = len(timings.get("execute_candidate", []))
+    print(f"\nBuys sent: {sent} in {duration:.0f}s ({sent / duration * 60:.1f}/min)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_mock_arguments(parser)
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run the bot")
+    parser.add_argument("--poll-interval", type=float, default=2, help="seconds between two new_pools requests")
+    parser.add_argument("--boost-delay", type=float, default=5, help="seconds the fake AI agent takes per boost lookup")
+    parser.add_argument("--verbose", action="store_true", help="show the bot output")
+    args = parser.parse_args()
+
+    server = start_mock_server(port=args.port, **mock_settings(args))
+    os.environ.update(mock_urls(server))
+    os.environ["PRIVATE_KEY_B64"] = base64.b64encode(bytes(Keypair())).decode()
+    os.environ.setdefault("METRICS_PORT", "0")
+    os.environ.setdefault("openai_key", "bench") # boosts are not called (the OpenAI client is built on first use)
+
+    # The bot reads and writes its model, positions and logs relative to the working directory
+    workdir = tempfile.mkdtemp(prefix="bench_bot_")
+    os.makedirs(os.path.join(workdir, "training"))
+    from features import FEATURE_NAMES
+    write_always_buy_model(os.path.join(workdir, "training", "patricio_model"), FEATURE_NAMES)
+    os.chdir(workdir)
+
+    import rate_governor
+    import trading_bot as bot
+    # The mock is not rate limited: measure the bot, not the pacing of the public APIs
+    rate_governor.configure("127.0.0.1", 1000.0, 1000)
+    bot.LOG_DISCOVERY = False
+    bot.STREAM_PRICES = False
+    bot.POLL_INTERVAL = args.poll_interval
+    # Boost lookups answered by a slow local fake (0 boosts: no Telegram alert)
+    from boost_service import fake_backend
+    bot.BOOST_LOOKUPS = True
+    bot.boost_service.get().backend = fake_backend("0", delay=args.boost_delay)
+    for name in STAGES + CALLS:
+        time_function(bot, name)
+
+    print(f"Running trading_bot.main() for {args.duration:.0f}s against the mock server "
+          f"(latency {args.latency:.0f}±{args.jitter:.0f} ms, error rate {args.error_rate:.0%})")
+    output = sys.stdout if args.verbose else io.StringIO()
+    with contextlib.redirect_stdout(output):
+        threading.Thread(target=bot.main, daemon=True).start()
+        time.sleep(args.duration)
+
+    print_timings(STAGES + ["detection_to_send"] + CALLS, args.duration)
+    print(f"\nBot metrics (p50/p95/p99): {bot.metrics.summary_line()}")
+    from gecko_cache import cache
+    print(f"GeckoTerminal cache: {cache.summary()}")
+    print(f"new_pools polling: {bot.new_pools_poller.summary()}")
+    print(f"Boost lookups: {bot.boost_service.summary()}")
+    print_mock_stats(server)
@@ -0,0 +1,101 @@
+"""
+OFFLINE THROUGHPUT BENCHMARK OF THE DATA COLLECTOR: A TEMPORARY STORE IS FILLED WITH POOLS STAGGERED
+ACROSS THE CHECKPOINT SCHEDULE (EVERY POOL HAS EXACTLY ONE OVERDUE CHECKPOINT, THE EARLIER ONES ARE
+ALREADY STORED) AND update_prices() IS CALLED AGAINST THE LOCAL MOCK SERVER UNTIL EVERY CHECKPOINT IS
+COLLECTED, REPORTING CHECKPOINTS PER MINUTE. EVERY CHECKPOINT IS A DISTINCT POOL, SO NONE IS ANSWERED BY
+THE RESPONSE CACHE (WITH --workers N THE POOLS ARE TRACKED BY THE SHARD WORKERS OF sharded_collector.py,
+SHARING ONE REQUEST BUDGET)
+
+Run:  python bench_collector.py --pools 600 --latency 80 --jitter 20 --error-rate 0.02 [--workers 4]
+(--gecko-rate 0.5 reproduces the public GeckoTerminal limit, unlimited by default)
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from mock_server import start_mock_server, mock_urls, add_mock_arguments, mock_settings, print_mock_stats
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(ROOT, "data-collecting"))
+sys.path.append(os.path.join(ROOT, "common"))
+
+# Price checkpoints stored (pending and archived pools)
+def stored_checkpoints(conn, price_columns):
+    return sum(conn.execute(f'SELECT COUNT("{column}") FROM {table}').fetchone()[0]
+               for table in ("pools", "pools_archive") for column in price_columns)
+
+# Checkpoints sampled by the run (pool i was stored with its first i % steps checkpoints)
+def sampled_checkpoints(conn, price_columns, pools, steps):
+    return stored_checkpoints(conn, price_columns) - sum(i % steps for i in range(pools))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_mock_arguments(parser)
+    parser.add_argument("--pools", type=int, default=3000, help="pools with one overdue checkpoint each")
+    parser.add_argument("--gecko-rate", type=float, default=None, help="GeckoTerminal requests/s (default: unlimited)")
+    parser.add_argument("--workers", type=int, default=1, help="shard worker processes (1: single process collector)")
+    parser.add_argument("--verbose", action="store_true", help="show the collector output")
+    args = parser.parse_args()
+
+    server = start_mock_server(port=args.port, **mock_settings(args))
+    os.environ.update(mock_urls(server))
+
+    import rate_governor
+    import get_pools_data as collector
+    from checkpoint_scheduler import schedule_pool
+    from dataset_store import PRICE_COLUMNS, open_store, insert_pool
+    from pool_record import load_pools
+    from sharded_collector import start_worker
+    import multiprocessing
+    from solders.pubkey import Pubkey
+    rate = args.gecko_rate or 1000.0
+    rate_governor.configure("127.0.0.1", rate, max(1, int(rate * 10)))
+
+    # Pool i is 1-60s past checkpoint i % 22 and already has the ones before it: one overdue checkpoint each
+    db_path = os.path.join(tempfile.mkdtemp(prefix="bench_collector_"), "dataset.db")
+    conn = open_store(db_path)
+    now = time.time()
+    for i in range(args.pools):
+        index = i % len(collector.STEPS)
+        insert_pool(conn, {"name": f"BENCH{i} / SOL", "address": str(Pubkey.new_unique()), "liquidity": 24875.3,
+                           "price0": 0.0000412, "timestamp": now - collector.STEPS[index][1] - 1 - i % 60,
+                           **{column: 0.0000412 for column, _ in collector.STEPS[:index]}})
+    total = args.pools
+    sampled = lambda: sampled_checkpoints(conn, PRICE_COLUMNS, args.pools, len(collector.STEPS))
+
+    print(f"Collecting {total} overdue checkpoints of {args.pools} pools with {args.workers} worker(s) against the "
+          f"mock server (latency {args.latency:.0f}±{args.jitter:.0f} ms, error rate {args.error_rate:.0%})")
+    output = sys.stdout if args.verbose else io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        if args.workers > 1:
+            buckets = rate_governor.shared_buckets(["127.0.0.1"])
+            workers = [start_worker(shard, args.workers, db_path, multiprocessing.Queue(), buckets)
+                       for shard in range(args.workers)]
+            while sampled() < total:
+                time.sleep(0.05)
+            for worker in workers:
+                worker.terminate()
+        else:
+            existing_pools = load_pools(conn)
+            schedule = []
+            for address, record in existing_pools.items():
+                schedule_pool(schedule, address, record, collector.STEPS)
+            # The next checkpoint of every pool is minutes away: done once the overdue ones are stored
+            while sampled() < total:
+                collector.update_prices(conn, existing_pools, schedule)
+                # Injected errors reschedule the checkpoint RETRY_DELAY later: wait for it as the collector does
+                time.sleep(collector.time_until_next(schedule, 1))
+    elapsed = time.perf_counter() - start
+
+    collected = sampled()
+    print(f"\nCheckpoints collected: {collected}/{total} in {elapsed:.1f}s")
+    print(f"Throughput: {collected / elapsed * 60:.0f} checkpoints/min")
+    if args.workers == 1:
+        from gecko_cache import cache
+        print(f"GeckoTerminal cache: {cache.summary()}")
+    print_mock_stats(server)
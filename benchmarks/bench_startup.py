@@ -0,0 +1,88 @@
+"""
+STARTUP BENCHMARK OF THE TRADING BOT: trading_bot IS IMPORTED IN A FRESH INTERPRETER WITH
+python -X importtime (THROWAWAY WALLET, ALWAYS-BUY MODEL) AND THE IMPORT TIME IS REPORTED WITH THE
+SLOWEST DIRECT IMPORTS. WITH --ready THE BOT ALSO WARMS UP ITS MODEL, WALLET AND RPC CONNECTION
+AGAINST THE LOCAL MOCK SERVER (TIME TO READY)
+
+Run:  python bench_startup.py --runs 5 --ready
+"""
+
+import argparse
+import base64
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import numpy as np
+from solders.keypair import Keypair
+from mock_server import start_mock_server, mock_urls, add_mock_arguments, mock_settings
+from bench_bot import write_always_buy_model
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(ROOT, "common"))
+
+# Child process: import the bot (and warm it up) and print the timings as the last line
+CHILD = """
+import contextlib, io, json, sys, time
+start = time.perf_counter()
+import trading_bot
+imported = time.perf_counter()
+if {ready}:
+    with contextlib.redirect_stdout(io.StringIO()):
+        trading_bot.start_up()
+print(json.dumps({{"import": imported - start, "ready": time.perf_counter() - start}}))
+"""
+
+# Modules imported directly by trading_bot, with their cumulative import time (µs)
+def direct_imports(importtime_output):
+    lines = [line for line in importtime_output.splitlines() if line.startswith("import time:") and "|" in line]
+    children = []
+    for line in lines:
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if name.strip() == "trading_bot" and depth == 0:
+            return children
+        if depth == 0:
+            children = []
+        elif depth == 1 and cumulative.strip().isdigit():
+            children.append((name.strip(), int(cumulative)))
+    return children
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_mock_arguments(parser)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters started (median reported)")
+    parser.add_argument("--top", type=int, default=10, help="slowest direct imports shown")
+    parser.add_argument("--ready", action="store_true", help="also warm up the bot against the mock server")
+    args = parser.parse_args()
+
+    # The bot reads its model relative to the working directory
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    os.makedirs(os.path.join(workdir, "training"))
+    from features import FEATURE_NAMES
+    write_always_buy_model(os.path.join(workdir, "training", "patricio_model"), FEATURE_NAMES)
+    env = dict(os.environ, PRIVATE_KEY_B64=base64.b64encode(bytes(Keypair())).decode(), METRICS_PORT="0",
+               PYTHONPATH=os.pathsep.join([os.path.join(ROOT, "trading"), os.path.join(ROOT, "common")]))
+    if args.ready:
+        env.update(mock_urls(start_mock_server(port=args.port, **mock_settings(args))))
+
+    runs, imports = [], {}
+    for _ in range(args.runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", CHILD.format(ready=args.ready)],
+                                cwd=workdir, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            sys.exit(f"❌ Bot startup failed:\n{result.stderr[-2000:]}")
+        runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+        for name, microseconds in direct_imports(result.stderr):
+            imports.setdefault(name, []).append(microseconds)
+
+    print(f"trading_bot startup, median of {args.runs} fresh interpreters")
+    print(f"Import: {np.median([run['import'] for run in runs]) * 1000:.0f} ms")
+    if args.ready:
+        print(f"Ready (import + warm-up against the mock, latency {args.latency:.0f} ms): "
+              f"{np.median([run['ready'] for run in runs]) * 1000:.0f} ms")
+    print(f"\nSlowest direct imports of trading_bot:\n{'':<26} {'ms':>7}")
+    slowest = sorted(((np.median(values) / 1000, name) for name, values in imports.items()), reverse=True)
+    for milliseconds, name in slowest[:args.top]:
+        print(f"{name:<26} {milliseconds:>7.1f}")
@@ -0,0 +1,269 @@
+"""
+LOCAL MOCK OF GECKOTERMINAL, JUPITER AND THE SOLANA RPC FOR THE BENCHMARKS: THE RESPONSES IN
+fixtures/ ARE REPLAYED (WITH FRESH POOL AND MINT ADDRESSES FOR EVERY LISTED POOL) AFTER A
+CONFIGURABLE LATENCY, AND A FRACTION OF THE REQUESTS CAN BE ANSWERED WITH AN ERROR
+
+new_pools lists --new-pools fresh pools on every page 1 request, or every --listing-interval seconds;
+pages (?page=N, 20 pools, newest first) carry an ETag and If-None-Match is answered with 304.
+
+Run:  python mock_server.py --port 8800 --latency 80 --jitter 20 --error-rate 0.02
+and point the bot / collector to it:
+GECKO_API_BASE=http://127.0.0.1:8800/api/v2  JUPITER_API_BASE=http://127.0.0.1:8800/swap/v1  RPC_URL=http://127.0.0.1:8800/rpc
+"""
+
+import argparse
+import base64
+import copy
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+from solders.transaction import VersionedTransaction
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+NEW_POOLS_PER_PAGE = 3 # fresh pools listed at a time (fixture items used in turn)
+PAGE_SIZE = 20         # pools per new_pools page
+MAX_PAGES = 10
+
+ROUTES = [
+    ("new_pools", "GET", re.compile(r"/api/v2/networks/solana/new_pools$")),
+    ("pools_multi", "GET", re.compile(r"/api/v2/networks/solana/pools/multi/(?P<addresses>[^/]+)$")),
+    ("pool", "GET", re.compile(r"/api/v2/networks/solana/pools/(?P<address>[^/]+)$")),
+    ("token_info", "GET", re.compile(r"/api/v2/networks/solana/tokens/(?P<mint>[^/]+)/info$")),
+    ("jupiter_quote", "GET", re.compile(r"/swap/v1/quote$")),
+    ("jupiter_swap", "POST", re.compile(r"/swap/v1/swap$")),
+    ("rpc", "POST", re.compile(r"/rpc/?$")),
+]
+
+# Read a fixture file
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name)) as f:
+        return json.load(f)
+
+# Replayed responses, latency/error settings and per-route counters
+class MockState:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=429, new_pools_per_page=NEW_POOLS_PER_PAGE,
+                 listing_interval=0.0):
+        self.latency = latency         # seconds added to every response
+        self.jitter = jitter           # +/- seconds of uniform noise on the latency
+        self.error_rate = error_rate   # fraction of requests answered with error_status
+        self.error_status = error_status
+        self.new_pools_per_page = new_pools_per_page
+        self.listing_interval = listing_interval  # 0: list new pools on every page 1 request
+        self.next_listing = time.time()
+        self.listed = []         # pools listed so far (newest last, the last MAX_PAGES pages are kept)
+        self.new_pools = load_fixture("new_pools.json")["data"]
+        self.pool = load_fixture("pool.json")["data"]
+        self.token_info = load_fixture("token_info.json")
+        self.quote = load_fixture("quote.json")
+        self.rpc = load_fixture("rpc.json")
+        self.mints = {}          # pool address -> base mint of the pools served by new_pools
+        self.swap_txs = {}       # user public key -> unsigned swap tx (base64)
+        self.stats = {}          # route -> [requests, errors]
+        self.lock = threading.Lock()
+        self.served_pools = 0
+
+    def count(self, route, error=False):
+        with self.lock:
+            stats = self.stats.setdefault(route, [0, 0])
+            stats[0] += 1
+            stats[1] += error
+
+    def delay(self):
+        if self.latency or self.jitter:
+            time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+
+    def inject_error(self):
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+    # --- RESPONSES --- #
+    # Add fresh pools to the listing (called with the lock held)
+    def list_pools(self, count, created_at):
+        for _ in range(count):
+            item = copy.deepcopy(self.new_pools[self.served_pools % len(self.new_pools)])
+            self.served_pools += 1
+            address, mint = str(Pubkey.new_unique()), str(Pubkey.new_unique())
+            item["id"] = f"solana_{address}"
+            item["attributes"]["address"] = address
+            item["attributes"]["pool_created_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(created_at))
+            item["relationships"]["base_token"]["data"]["id"] = f"solana_{mint}"
+            self.mints[address] = mint
+            self.listed.append(item)
+        del self.listed[:-PAGE_SIZE * MAX_PAGES]
+
+    def new_pools_page(self, page):
+        now = time.time()
+        with self.lock:
+            if self.listing_interval > 0:
+                while self.next_listing <= now:
+                    self.list_pools(self.new_pools_per_page, self.next_listing)
+                    self.next_listing += self.listing_interval
+            elif page == 1:
+                self.list_pools(self.new_pools_per_page, now)
+            newest_first = self.listed[::-1]
+        return {"data": newest_first[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]}
+
+    def pool_data(self, address):
+        item = copy.deepcopy(self.pool)
+        item["id"] = f"solana_{address}"
+        item["attributes"]["address"] = address
+        if address in self.mints:
+            item["relationships"]["base_token"]["data"]["id"] = f"solana_{self.mints[address]}"
+        return item
+
+    def jupiter_quote(self, params):
+        quote = dict(self.quote)
+        for key in ("inputMint", "outputMint", "inAmount"):
+            name = "amount" if key == "inAmount" else key
+            if name in params:
+                quote[key] = params[name][0]
+        return quote
+
+    # Unsigned v0 tx paid by the user, as returned by /swap (one per wallet)
+    def jupiter_swap(self, payload):
+        user = payload.get("userPublicKey") or str(Keypair().pubkey())
+        if user not in self.swap_txs:
+            message = MessageV0.try_compile(Pubkey.from_string(user), [], [], Hash.default())
+            tx = VersionedTransaction.populate(message, [Signature.default()])
+            self.swap_txs[user] = base64.b64encode(bytes(tx)).decode()
+        return {"swapTransaction": self.swap_txs[user], "lastValidBlockHeight": 322409840,
+                "prioritizationFeeLamports": 100000}
+
+    def rpc_result(self, request):
+        method, params = request.get("method"), request.get("params") or []
+        if method == "sendTransaction":
+            tx = VersionedTransaction.from_bytes(base64.b64decode(params[0]))
+            return str(tx.signatures[0])
+        if method == "getSignatureStatuses":
+            return {"context": self.rpc["getBalance"]["context"],
+                    "value": [self.rpc["signatureStatus"] for _ in params[0]]}
+        if method == "getMultipleAccounts":
+            return {"context": self.rpc["getBalance"]["context"], "value": [None for _ in params[0]]}
+        return self.rpc.get(method)
+
+# Dispatch of the requests to the MockState of the server
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _send(self, status, body, headers=None):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self, method):
+        state = self.server.state
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+
+        for route, route_method, pattern in ROUTES:
+            match = pattern.match(url.path)
+            if match and method == route_method:
+                break
+        else:
+            state.count("unknown", error=True)
+            return self._send(404, {"error": f"no fixture for {method} {url.path}"})
+
+        state.delay()
+        if state.inject_error():
+            state.count(route, error=True)
+            return self._send(state.error_status, {"error": "injected"}, {"Retry-After": "1"})
+        state.count(route)
+
+        if route == "new_pools":
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+            data = json.dumps(state.new_pools_page(page)).encode()
+            etag = '"' + hashlib.blake2b(data, digest_size=8).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, b"", {"ETag": etag})
+            return self._send(200, data, {"ETag": etag})
+        if route == "pools_multi":
+            return self._send(200, {"data": [state.pool_data(a) for a in match["addresses"].split(",")]})
+        if route == "pool":
+            return self._send(200, {"data": state.pool_data(match["address"])})
+        if route == "token_info":
+            return self._send(200, state.token_info)
+        if route == "jupiter_quote":
+            return self._send(200, state.jupiter_quote(parse_qs(url.query)))
+        if route == "jupiter_swap":
+            return self._send(200, state.jupiter_swap(body or {}))
+        # JSON-RPC (single request or batch)
+        requests = body if isinstance(body, list) else [body]
+        responses = [{"jsonrpc": "2.0", "id": request.get("id"), "result": state.rpc_result(request)}
+                     for request in requests]
+        self._send(200, responses if isinstance(body, list) else responses[0])
+
+# Start the mock server in a background thread (returns the server, its state is server.state)
+def start_mock_server(host="127.0.0.1", port=8800, **settings):
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.state = MockState(**settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# Base URLs of the mock for GECKO_API_BASE, JUPITER_API_BASE and RPC_URL
+def mock_urls(server):
+    host, port = server.server_address[:2]
+    base = f"http://{host}:{port}"
+    return {"GECKO_API_BASE": base + "/api/v2", "JUPITER_API_BASE": base + "/swap/v1", "RPC_URL": base + "/rpc"}
+
+# Common command line options of the mock and the benchmarks
+def add_mock_arguments(parser):
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=float, default=50, help="ms added to every response")
+    parser.add_argument("--jitter", type=float, default=10, help="+/- ms of uniform noise")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=429)
+    parser.add_argument("--new-pools", type=int, default=NEW_POOLS_PER_PAGE, help="fresh pools listed at a time")
+    parser.add_argument("--listing-interval", type=float, default=0.0,
+                        help="seconds between two listings (0: on every new_pools page 1 request)")
+
+def mock_settings(args):
+    return {"latency": args.latency / 1000, "jitter": args.jitter / 1000, "error_rate": args.error_rate,
+            "error_status": args.error_status, "new_pools_per_page": args.new_pools,
+            "listing_interval": args.listing_interval}
+
+# Requests and errors served per route
+def print_mock_stats(server):
+    print("\nMOCK SERVER REQUESTS")
+    print("---------------------------")
+    for route, (requests, errors) in sorted(server.state.stats.items()):
+        print(f"{route:<14} {requests:>7} requests | {errors:>5} errors")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+    server = start_mock_server(port=args.port, **mock_settings(args))
+    for name, url in mock_urls(server).items():
+        print(f"{name}={url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print_mock_stats(server)
@@ -0,0 +1,176 @@
+"""
+GENERATOR OF THE WEBSOCKET SESSIONS IN fixtures/ REPLAYED BY trading/ws_replay.py: A logsSubscribe SESSION
+ON THE PUMPSWAP PROGRAM (CreatePool, MIGRATIONS FROM PUMP.FUN, FAILED CREATIONS AND SWAP NOISE) WITH THE
+getTransaction RESPONSES OF EVERY CREATION, AND AN accountSubscribe SESSION OF THE TWO VAULTS OF A POOL
+WHOSE PRICE DOUBLES, WITH THE POOL, MINT AND VAULT ACCOUNTS READ BEFORE SUBSCRIBING, IN THE SHAPE SERVED
+BY MAINNET. THE ADDRESSES ARE DERIVED FROM A FIXED SEED, SO THE FILES ARE REPRODUCIBLE; RECORDINGS OF A
+LIVE SESSION IN THE SAME FORMAT CAN REPLACE THEM
+
+Run:  python ws_fixtures.py   (writes fixtures/logs_session.jsonl, fixtures/pool_creation_txs.json,
+                               fixtures/account_session.jsonl and fixtures/price_pool_accounts.json)
+"""
+
+import base64
+import json
+import os
+import sys
+import numpy as np
+from solders.keypair import Keypair
+from solders.pubkey import Pubkey
+from solders.signature import Signature
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(ROOT, "trading"))
+from pool_discovery import B58_ALPHABET, CREATE_POOL_DISCRIMINATOR, PUMPSWAP_PROGRAM_ID
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SEED = 2025
+CREATIONS = 12              # successful CreatePool txs (one in three is a pump.fun migration)
+NOISE_PER_CREATION = 3      # swap notifications between two creations
+PUMP_FUN_PROGRAM_ID = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+WSOL_MINT = "So11111111111111111111111111111111111111112"
+SYSTEM_PROGRAM_ID = "11111111111111111111111111111111"
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGqPTxZ6GQt6kFkGrdGAWR2v6"
+SLOT = 344120600
+# Vault session: constant product pool traded until its price doubles
+TRADES = 60
+BASE_RESERVE = 200_000_000 * 10**6   # raw base tokens (6 decimals)
+QUOTE_RESERVE = 85 * 10**9           # raw WSOL (9 decimals)
+
+rng = np.random.default_rng(SEED)
+
+def pubkey():
+    return str(Keypair.from_seed(rng.bytes(32)).pubkey())
+
+def signature():
+    return str(Signature.from_bytes(rng.bytes(64)))
+
+def b58encode(data):
+    number = int.from_bytes(data, "big")
+    encoded = ""
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = B58_ALPHABET[remainder] + encoded
+    return "1" * (len(data) - len(data.lstrip(b"\0"))) + encoded
+
+# create_pool(index: u16, base_amount_in: u64, quote_amount_in: u64) instruction data
+def create_pool_data():
+    return b58encode(CREATE_POOL_DISCRIMINATOR + int(rng.integers(0, 2**16)).to_bytes(2, "little")
+                     + int(rng.integers(10**14, 10**15)).to_bytes(8, "little")
+                     + int(rng.integers(10**10, 10**11)).to_bytes(8, "little"))
+
+def logs(signature_, instruction, err=None):
+    lines = [f"Program {PUMPSWAP_PROGRAM_ID} invoke [1]", f"Program log: Instruction: {instruction}",
+             f"Program {PUMPSWAP_PROGRAM_ID} consumed {int(rng.integers(40000, 90000))} of 200000 compute units"]
+    lines.append(f"Program {PUMPSWAP_PROGRAM_ID} " + ("failed: custom program error: 0x1771" if err else "success"))
+    return {"context": {"slot": SLOT}, "value": {"signature": signature_, "err": err, "logs": lines}}
+
+# getTransaction (json encoding) of a pool creation; migrate: CreatePool is an inner instruction of
+# the pump.fun migration and the PumpSwap program and the base mint come from an address lookup table
+def creation_tx(signature_, pool, base_mint, migrate):
+    creator, global_config, lp_mint = pubkey(), pubkey(), pubkey()
+    accounts = [pool, global_config, creator, base_mint, WSOL_MINT, lp_mint] + [pubkey() for _ in range(4)]
+    if migrate:
+        static = [creator, pool, lp_mint] + accounts[6:] + [global_config, WSOL_MINT, PUMP_FUN_PROGRAM_ID,
+                                                            SYSTEM_PROGRAM_ID, TOKEN_PROGRAM_ID]
+        loaded = {"writable": [base_mint], "readonly": [PUMPSWAP_PROGRAM_ID]}
+        keys = static + loaded["writable"] + loaded["readonly"]
+        create = {"programIdIndex": keys.index(PUMPSWAP_PROGRAM_ID), "accounts": [keys.index(a) for a in accounts],
+                  "data": create_pool_data(), "stackHeight": 2}
+        instructions = [{"programIdIndex": keys.index(PUMP_FUN_PROGRAM_ID), "accounts": list(range(len(static) - 2)),
+                         "data": b58encode(rng.bytes(8)), "stackHeight": None}]
+        inner = [{"index": 0, "instructions": [create]}]
+    else:
+        static = [creator, pool, lp_mint] + accounts[6:] + [base_mint, global_config, WSOL_MINT,
+                                                            PUMPSWAP_PROGRAM_ID, SYSTEM_PROGRAM_ID, TOKEN_PROGRAM_ID]
+        loaded = {"writable": [], "readonly": []}
+        keys = static
+        instructions = [{"programIdIndex": keys.index(PUMPSWAP_PROGRAM_ID), "accounts": [keys.index(a) for a in accounts],
+                         "data": create_pool_data(), "stackHeight": None}]
+        inner = []
+    return {
+        "slot": SLOT, "blockTime": 1760781600, "version": 0,
+        "meta": {"err": None, "fee": 5000, "innerInstructions": inner, "loadedAddresses": loaded,
+                 "logMessages": logs(signature_, "CreatePool")["value"]["logs"], "status": {"Ok": None}},
+        "transaction": {"signatures": [signature_],
+                        "message": {"accountKeys": static, "instructions": instructions,
+                                    "header": {"numRequiredSignatures": 1, "numReadonlySignedAccounts": 0,
+                                               "numReadonlyUnsignedAccounts": 6},
+                                    "recentBlockhash": pubkey()}},
+    }
+
+# Account data (base64) of a PumpSwap pool, a mint and an SPL token account
+def pool_account(base_mint, base_vault, quote_vault):
+    keys = [pubkey(), base_mint, WSOL_MINT, pubkey(), base_vault, quote_vault]
+    data = bytes(8) + bytes([255]) + bytes(2) + b"".join(bytes(Pubkey.from_string(key)) for key in keys) + bytes(40)
+    return base64.b64encode(data).decode()
+
+def mint_account(decimals):
+    return base64.b64encode(bytes(44) + bytes([decimals]) + bytes(37)).decode()
+
+def token_account(amount):
+    return base64.b64encode(bytes(64) + amount.to_bytes(8, "little") + bytes(93)).decode()
+
+def account_notification(amount):
+    return {"context": {"slot": SLOT}, "value": {"data": [token_account(amount), "base64"], "executable": False,
+                                                 "lamports": 2039280, "owner": TOKEN_PROGRAM_ID, "rentEpoch": 0,
+                                                 "space": 165}}
+
+# Vault updates of a pool traded by buys and sells until its price is 2.2x the first one; every record
+# carries the price (SOL) computed from the two vaults once it is applied
+def account_session():
+    pool, base_mint, base_vault, quote_vault = pubkey(), pubkey(), pubkey(), pubkey()
+    accounts = {pool: pool_account(base_mint, base_vault, quote_vault), base_mint: mint_account(6),
+                WSOL_MINT: mint_account(9), base_vault: token_account(BASE_RESERVE),
+                quote_vault: token_account(QUOTE_RESERVE)}
+    base, quote = BASE_RESERVE, QUOTE_RESERVE
+    first_price = (quote / 10**9) / (base / 10**6)
+    session = []
+    for _ in range(TRADES):
+        # Mostly buys: the quote reserve grows ~1.6% per trade on average
+        amount = int(quote * rng.uniform(-0.015, 0.04))
+        k = base * quote
+        old_base, quote = base, quote + amount
+        base = k // quote
+        price = (quote / 10**9) / (base / 10**6)
+        # The quote vault changes first (SOL in), then the base vault (tokens out), in the same slot
+        session.append({"delay": round(float(rng.uniform(0.05, 0.25)), 3), "method": "accountNotification",
+                        "key": quote_vault, "result": account_notification(quote),
+                        "price": (quote / 10**9) / (old_base / 10**6)})
+        session.append({"delay": 0.002, "method": "accountNotification", "key": base_vault,
+                        "result": account_notification(base), "price": price})
+        if price >= 2.2 * first_price:
+            break
+    return pool, accounts, session
+
+if __name__ == "__main__":
+    session, transactions = [], {}
+    for i in range(CREATIONS):
+        for _ in range(NOISE_PER_CREATION):
+            session.append({"delay": round(float(rng.uniform(0.02, 0.15)), 3), "method": "logsNotification",
+                            "key": PUMPSWAP_PROGRAM_ID, "result": logs(signature(), str(rng.choice(["Buy", "Sell"])))})
+        if i % 4 == 3:
+            # Failed creation: logged, never resolved
+            session.append({"delay": 0.05, "method": "logsNotification", "key": PUMPSWAP_PROGRAM_ID,
+                            "result": logs(signature(), "CreatePool", err={"InstructionError": [0, {"Custom": 6001}]})})
+        signature_, pool, base_mint = signature(), pubkey(), pubkey()
+        session.append({"delay": round(float(rng.uniform(0.05, 0.3)), 3), "method": "logsNotification",
+                        "key": PUMPSWAP_PROGRAM_ID, "result": logs(signature_, "CreatePool"),
+                        "pool": pool, "base_mint": base_mint})
+        # Recorded getTransaction answers in order: the node often returns null right after the notification
+        tx = creation_tx(signature_, pool, base_mint, migrate=i % 3 == 1)
+        transactions[signature_] = [None, tx] if i % 2 else [tx]
+
+    with open(os.path.join(FIXTURES_DIR, "logs_session.jsonl"), "w") as f:
+        f.writelines(json.dumps(record) + "\n" for record in session)
+    with open(os.path.join(FIXTURES_DIR, "pool_creation_txs.json"), "w") as f:
+        json.dump(transactions, f, indent=1)
+    print(f"logs_session.jsonl: {len(session)} notifications ({CREATIONS} creations) | "
+          f"pool_creation_txs.json: {len(transactions)} transactions")
+
+    pool, accounts, prices = account_session()
+    with open(os.path.join(FIXTURES_DIR, "account_session.jsonl"), "w") as f:
+        f.writelines(json.dumps(record) + "\n" for record in prices)
+    with open(os.path.join(FIXTURES_DIR, "price_pool_accounts.json"), "w") as f:
+        json.dump({"pool": pool, "accounts": accounts}, f, indent=1)
+    print(f"account_session.jsonl: {len(prices)} vault updates of pool {pool} | price_pool_accounts.json")
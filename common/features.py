@@ -0,0 +1,145 @@
+"""
+SHARED FEATURE PIPELINE: THE SAME FEATURES OF THE GECKOTERMINAL POOL + TOKEN RECORDS (gecko_decode.py)
+ARE USED BY THE DATA COLLECTOR (DATASET ROWS) AND BY THE TRADING BOT (LIVE MODEL INPUT), AND THE LABELS OF THE
+WHOLE DATASET ARE BUILT FROM THE PRICE CHECKPOINTS IN ONE NUMPY PASS
+
+Parity check on a dataset:  python features.py dataset.csv
+"""
+
+import numpy as np
+import sys
+
+# Model input, in training order
+FEATURE_NAMES = ["liquidity", "volume", "market_cap", "holders", "top_10", "twitter", "b/s", "v/mc", "price0"]
+# Price checkpoints collected after price0 and their delay (minutes)
+PRICE_COLUMNS = ["price_10m", "price_15m", "price_20m", "price_25m", "price_30m", "price_35m", "price_40m",
+                 "price_45m", "price_50m", "price_55m", "price_60m", "price_2h", "price_3h", "price_4h", "price_5h",
+                 "price_6h", "price_7h", "price_8h", "price_9h", "price_10h", "price_11h", "price_12h"]
+CHECKPOINT_MINUTES = [10, 15, 20, 25, 30, 35, 40, 45, 50, 55, 60,
+                      120, 180, 240, 300, 360, 420, 480, 540, 600, 660, 720]
+# Default labels: 2x within the last checkpoint (label_2x, the target of rf_model.py)
+LABEL_MULTIPLES = (2,)
+LABEL_HORIZONS = ("price_12h",)
+
+NAN = float("nan")
+
+# Liquidity (USD) and locked liquidity percentage of a pool record (NaN if the payload is broken)
+def pool_liquidity_lock(pool):
+    if pool.liquidity != pool.liquidity or pool.lock != pool.lock:
+        print(f"Error in parsing liquidity and/or lock of {pool.address or 'pool'}")
+        return NAN, NAN
+    return pool.liquidity, pool.lock
+
+# Pool features: liquidity, volume, market cap, buy/sell ratio, volume/market cap, price0
+def parse_pool_features(pool):
+    liquidity, _ = pool_liquidity_lock(pool)
+    volume, fdv = pool.volume_h24, pool.fdv
+    if volume != volume or fdv != fdv:
+        print(f"Error in parsing volume and/or fdv of {pool.address or 'pool'}")
+        volume, fdv = NAN, NAN
+
+    buys, sells = pool.buys_h24, pool.sells_h24
+    return {
+        'liquidity': liquidity,
+        'volume': volume,
+        'market_cap': fdv,
+        'b/s': (buys / (buys + sells)) if buys > 0 else NAN,
+        'v/mc': (volume / fdv) if volume > 0 and fdv > 0 else NAN,
+        'price0': pool.price,
+    }
+
+# Token features: holders, top 10 distribution, X profile dummy (NaN if the token info is missing)
+def parse_token_features(token):
+    if token is None:
+        return {'holders': NAN, 'top_10': NAN, 'twitter': NAN}
+    return {
+        'holders': token.holders,
+        'top_10': token.top_10,
+        'twitter': 1 if token.twitter else 0,
+    }
+
+# All the features of a candidate ({name: value}, same keys as the dataset columns)
+def parse_features(pool, token):
+    features = {**parse_pool_features(pool), **parse_token_features(token)}
+    return {name: features[name] for name in FEATURE_NAMES}
+
+# Fixed-order float32 vector of a features dict (missing values are NaN)
+def feature_vector(features, names=FEATURE_NAMES):
+    return np.array([features.get(name, NAN) for name in names], dtype=np.float32)
+
+# Same vectors for every row of a dataset (pandas DataFrame)
+def feature_matrix(df, names=FEATURE_NAMES):
+    import pandas as pd
+    return df[list(names)].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float32)
+
+# Label column name of a multiple/horizon (label_2x for the last checkpoint, label_2x_60m otherwise)
+def label_name(multiple, horizon=PRICE_COLUMNS[-1]):
+    suffix = "" if horizon == PRICE_COLUMNS[-1] else "_" + horizon.replace("price_", "")
+    return f"label_{multiple:g}x{suffix}"
+
+# Labels of every pool for every multiple and horizon, in one pass over the checkpoint matrix:
+# 1 if the price reached multiple x price0 by the horizon, 0 if it did not and the horizon
+# checkpoint was collected, NaN while the pool is still being tracked
+def build_labels(df, multiples=LABEL_MULTIPLES, horizons=LABEL_HORIZONS):
+    import pandas as pd
+    price0 = pd.to_numeric(df["price0"], errors="coerce").to_numpy(dtype=np.float64)
+    prices = df[PRICE_COLUMNS].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = prices / price0[:, None]
+    ratios[~(price0 > 0)] = np.nan
+
+    # Best ratio seen up to every checkpoint (NaN checkpoints are skipped)
+    running_max = np.fmax.accumulate(ratios, axis=1)
+    horizon_index = [PRICE_COLUMNS.index(horizon) for horizon in horizons]
+    best = running_max[:, horizon_index]                    # (N, H)
+    collected = ~np.isnan(ratios[:, horizon_index])         # (N, H)
+    hit = best[None, :, :] >= np.asarray(multiples, dtype=np.float64)[:, None, None]  # (M, N, H)
+    labels = np.where(hit, 1.0, np.where(collected[None], 0.0, np.nan))
+
+    return pd.DataFrame({
+        label_name(multiple, horizon): labels[m, :, h]
+        for m, multiple in enumerate(multiples) for h, horizon in enumerate(horizons)
+    }, index=df.index)
+
+
+# --- PARITY CHECK: TRAINING (DATASET) VS INFERENCE (PAYLOAD) PATH --- #
+if __name__ == "__main__":
+    import pandas as pd
+    from gecko_decode import pool_from_resource, token_from_resource
+
+    df = pd.read_csv(sys.argv[1] if len(sys.argv) > 1 else "dataset.csv")
+
+    # Rebuild the GeckoTerminal payload of every row and parse it as the bot does
+    def payloads(row):
+        volume, fdv = row["volume"], row["market_cap"]
+        b_s = row["b/s"]
+        buys, sells = (1000 * b_s, 1000 * (1 - b_s)) if b_s == b_s else (0, 0)
+        pool_attributes = {"reserve_in_usd": str(row["liquidity"]), "locked_liquidity_percentage": 100,
+                           "volume_usd": {"h24": str(volume)}, "fdv_usd": str(fdv),
+                           "transactions": {"h24": {"buys": buys, "sells": sells}},
+                           "base_token_price_usd": str(row["price0"])}
+        token_attributes = None if row["holders"] != row["holders"] else {
+            "holders": {"count": row["holders"], "distribution_percentage": {"top_10": row["top_10"]}},
+            "twitter_handle": "x" if row["twitter"] else None}
+        return (pool_from_resource({"attributes": pool_attributes}),
+                None if token_attributes is None else token_from_resource({"attributes": token_attributes}))
+
+    training = feature_matrix(df)
+    inference = np.stack([feature_vector(parse_features(*payloads(row))) for row in df.to_dict("records")])
+    # v/mc and b/s are recomputed from the payload: allow float32 rounding
+    same = np.isclose(training, inference, rtol=1e-5, equal_nan=True)
+    print(f"Features: {same.all(axis=1).sum()}/{len(df)} rows identical")
+
+    # Vectorized labels vs a per-row loop
+    labels = build_labels(df, multiples=(1.5, 2, 3), horizons=("price_60m", "price_6h", "price_12h"))
+    mismatches = 0
+    for i, row in enumerate(df.to_dict("records")):
+        for multiple in (1.5, 2, 3):
+            for horizon in ("price_60m", "price_6h", "price_12h"):
+                window = [row[column] / row["price0"] for column in PRICE_COLUMNS[:PRICE_COLUMNS.index(horizon) + 1]
+                          if row[column] == row[column] and row["price0"] > 0]
+                expected = 1.0 if window and max(window) >= multiple else \
+                    (0.0 if row[horizon] == row[horizon] and row["price0"] > 0 else NAN)
+                value = labels[label_name(multiple, horizon)].iloc[i]
+                mismatches += not (value == expected or (value != value and expected != expected))
+    print(f"Labels: {mismatches} mismatches over {labels.size} values")
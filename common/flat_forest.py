@@ -0,0 +1,123 @@
+"""
+FLAT-ARRAY RANDOM FOREST: THE TREES OF A TRAINED RandomForestClassifier ARE EXPORTED INTO
+CONCATENATED NUMPY ARRAYS (FEATURE, THRESHOLD, CHILDREN, LEAF VALUES) AND A SINGLE FEATURE
+VECTOR OR A BATCH IS SCORED DIRECTLY, WITHOUT PANDAS AND SKLEARN VALIDATION
+
+Parity check and benchmark:  python flat_forest.py patricio.pkl dataset.csv
+"""
+
+import numpy as np
+import pickle
+import sys
+import time
+
+# Forest stored as flat node arrays; every tree starts at one of the roots
+class FlatForest:
+    def __init__(self, arrays):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.missing_left = arrays["missing_left"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.classes = arrays["classes"]
+        self.feature_names = [str(name) for name in arrays["feature_names"]]
+        self.max_depth = int(arrays["max_depth"])
+
+    # Flatten the trees of a fitted RandomForestClassifier
+    @classmethod
+    def from_model(cls, model):
+        features, thresholds, lefts, rights, missing, values, roots = [], [], [], [], [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            nodes = np.arange(offset, offset + tree.node_count)
+            is_leaf = tree.children_left == -1
+            # Leaves point to themselves, so walking past them is harmless
+            left = np.where(is_leaf, nodes, tree.children_left + offset)
+            right = np.where(is_leaf, nodes, tree.children_right + offset)
+            value = tree.value[:, 0, :]
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            lefts.append(left)
+            rights.append(right)
+            missing.append(getattr(tree, "missing_go_to_left", np.zeros(tree.node_count, dtype=np.uint8)))
+            values.append(value / value.sum(axis=1, keepdims=True))
+            roots.append(offset)
+            offset += tree.node_count
+
+        feature_names = getattr(model, "feature_names_in_", [f"x{i}" for i in range(model.n_features_in_)])
+        return cls({
+            "feature": np.concatenate(features).astype(np.intp),
+            "threshold": np.concatenate(thresholds).astype(np.float64),
+            "left": np.concatenate(lefts).astype(np.intp),
+            "right": np.concatenate(rights).astype(np.intp),
+            "missing_left": np.concatenate(missing).astype(bool),
+            "value": np.concatenate(values).astype(np.float64),
+            "roots": np.array(roots, dtype=np.intp),
+            "classes": np.asarray(model.classes_),
+            "feature_names": np.array(feature_names, dtype=str),
+            "max_depth": max(estimator.tree_.max_depth for estimator in model.estimators_),
+        })
+
+    # Class probabilities for a feature vector or a batch of vectors (same order as feature_names)
+    def predict_proba(self, X):
+        # sklearn compares float32 features with float64 thresholds: do the same for parity
+        X = np.atleast_2d(np.asarray(X, dtype=np.float32))
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.repeat(self.roots[None, :], X.shape[0], axis=0)  # (samples, trees)
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[nodes]]
+            go_left = np.where(np.isnan(x), self.missing_left[nodes], x <= self.threshold[nodes])
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.value[nodes].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+    # Save all arrays in a single .npz file
+    def save(self, path):
+        np.savez(path, feature=self.feature, threshold=self.threshold, left=self.left, right=self.right,
+                 missing_left=self.missing_left, value=self.value, roots=self.roots, classes=self.classes,
+                 feature_names=np.array(self.feature_names, dtype=str), max_depth=self.max_depth)
+
+# Load a forest saved with FlatForest.save
+def load_forest(path):
+    with np.load(path) as arrays:
+        return FlatForest({name: arrays[name] for name in arrays.files})
+
+# Export the trained model next to its pickle
+def export_forest(model, path):
+    FlatForest.from_model(model).save(path)
+    print(f"Flat model saved as {path}")
+
+
+# --- PARITY CHECK & BENCHMARK --- #
+if __name__ == "__main__":
+    import pandas as pd
+
+    model_path = sys.argv[1] if len(sys.argv) > 1 else "patricio.pkl"
+    dataset_path = sys.argv[2] if len(sys.argv) > 2 else "dataset.csv"
+    with open(model_path, 'rb') as f:
+        model = pickle.load(f)
+    forest = FlatForest.from_model(model)
+    X = pd.read_csv(dataset_path)[forest.feature_names]
+
+    # Parity on the whole dataset
+    mismatches = int((forest.predict(X.to_numpy()) != model.predict(X)).sum())
+    print(f"Parity: {len(X) - mismatches}/{len(X)} predictions equal to model.predict")
+
+    # Single candidate latency, as on the bot critical path
+    row = X.iloc[0].to_dict()
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        model.predict(pd.DataFrame({name: [value] for name, value in row.items()}))
+    sklearn_ms = (time.perf_counter() - start) / runs * 1000
+    vector = [row[name] for name in forest.feature_names]
+    start = time.perf_counter()
+    for _ in range(runs):
+        forest.predict(vector)
+    flat_ms = (time.perf_counter() - start) / runs * 1000
+    print(f"DataFrame + model.predict: {sklearn_ms:.3f} ms | FlatForest.predict: {flat_ms:.3f} ms | x{sklearn_ms / flat_ms:.1f}")
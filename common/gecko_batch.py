@@ -0,0 +1,59 @@
+"""
+BATCHED POOL LOOKUPS THROUGH THE GECKOTERMINAL MULTI-POOL ENDPOINT: THE ADDRESSES OF ALL
+CALLERS ARE SENT IN CHUNKS OF 30 AND THE RESULTS ARE SPLIT BACK BY POOL ADDRESS
+
+Set GECKO_API_BASE (e.g. http://127.0.0.1:8000/api/v2) to run against a local mock server.
+"""
+
+import requests
+import os
+import rate_governor
+from gecko_cache import cache
+from gecko_decode import decode_pools
+
+# API Endpoint configuration
+GECKO_API_BASE = os.getenv("GECKO_API_BASE", "https://api.geckoterminal.com/api/v2").rstrip("/")
+MULTI_POOLS_API = GECKO_API_BASE + "/networks/solana/pools/multi/{}"
+MAX_BATCH_SIZE = 30 # max pools per multi-pool request
+
+# Get pools data for many addresses ({address: GeckoPool}, missing pools are left out)
+# Pools fetched in the last seconds come from the cache, shared with the single pool lookups
+def fetch_pools_multi(addresses):
+    results, missing = {}, []
+    for address in dict.fromkeys(addresses): # drop duplicates, keep order
+        pool = cache.lookup("pool", address)
+        if pool is None:
+            missing.append(address)
+        else:
+            results[address] = pool
+    for start in range(0, len(missing), MAX_BATCH_SIZE):
+        chunk = missing[start:start + MAX_BATCH_SIZE]
+        try:
+            response = rate_governor.get(MULTI_POOLS_API.format(",".join(chunk)))
+        except requests.RequestException as e:
+            print(f"Error in API request 'Fetch Pools Multi': {e}")
+            continue
+        if response.status_code != 200:
+            print(f"Error in API request 'Fetch Pools Multi': {response.status_code}")
+            continue
+        for pool in decode_pools(response.content):
+            if pool.address:
+                results[pool.address] = pool
+                cache.store("pool", pool.address, pool)
+    return results
+
+# Read a price from a pool record (None if the pool or its price is missing)
+def pool_price(pool, field="price"):
+    price = getattr(pool, field, None)
+    return None if price is None or price != price else price
+
+# Get base token prices for many pools ({address: price}, unparsable prices are left out)
+def fetch_pool_prices(addresses):
+    prices = {}
+    for address, pool in fetch_pools_multi(addresses).items():
+        price = pool_price(pool)
+        if price is None:
+            print(f"Error in parsing price of {address}")
+        else:
+            prices[address] = price
+    return prices
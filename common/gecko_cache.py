@@ -0,0 +1,109 @@
+"""
+RESPONSE CACHE IN FRONT OF THE GECKOTERMINAL LOOKUPS: PER-ENDPOINT TTL, BOUNDED LRU EVICTION AND
+SINGLE-FLIGHT DEDUPLICATION (CONCURRENT CALLS FOR THE SAME KEY WAIT FOR ONE REQUEST INSTEAD OF
+SENDING THEIR OWN). HIT/MISS/SHARED COUNTERS SHOW HOW MANY API CALLS ARE SAVED
+"""
+
+import threading
+import time
+from collections import OrderedDict
+import metrics
+
+# Seconds a response stays valid, per endpoint (0: never stored, only deduplicated)
+TTLS = {
+    "pool": 5,            # pools/{address} and the pools of pools/multi (prices move fast)
+    "token_info": 300,    # tokens/{mint}/info (holders, socials)
+}
+DEFAULT_TTL = 5
+MAX_ENTRIES = 4096        # least recently used entries are evicted beyond this size
+
+# Request in progress: the first caller fetches, the others wait for its result
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+class ResponseCache:
+    def __init__(self, max_entries=MAX_ENTRIES, ttls=TTLS):
+        self.max_entries = max_entries
+        self.ttls = ttls
+        self.entries = OrderedDict()   # (endpoint, key) -> (expires at, value)
+        self.flights = {}              # (endpoint, key) -> _Flight
+        self.counters = {}             # endpoint -> {"hit": n, "miss": n, "shared": n}
+        self.lock = threading.Lock()
+
+    def _count(self, endpoint, result):
+        counters = self.counters.setdefault(endpoint, {"hit": 0, "miss": 0, "shared": 0})
+        counters[result] += 1
+        metrics.increment("gecko_cache_total", endpoint=endpoint, result=result)
+
+    # Fresh cached value (None if missing or expired), counted as a hit or a miss
+    def lookup(self, endpoint, key):
+        with self.lock:
+            entry = self.entries.get((endpoint, key))
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end((endpoint, key))
+                self._count(endpoint, "hit")
+                return entry[1]
+            self._count(endpoint, "miss")
+            return None
+
+    # Store a value (empty responses, i.e. failed calls, are never stored)
+    def store(self, endpoint, key, value):
+        ttl = self.ttls.get(endpoint, DEFAULT_TTL)
+        if not value or ttl <= 0:
+            return
+        with self.lock:
+            self.entries[(endpoint, key)] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end((endpoint, key))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    # Cached value of a key, or fetch() called once for all the concurrent callers (fresh: skip the cache)
+    def get(self, endpoint, key, fetch, fresh=False):
+        with self.lock:
+            entry = None if fresh else self.entries.get((endpoint, key))
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end((endpoint, key))
+                self._count(endpoint, "hit")
+                return entry[1]
+            flight = self.flights.get((endpoint, key))
+            leader = flight is None
+            if leader:
+                flight = self.flights[(endpoint, key)] = _Flight()
+            self._count(endpoint, "miss" if leader else "shared")
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = fetch()
+            self.store(endpoint, key, flight.value)
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.flights[(endpoint, key)]
+            flight.done.set()
+
+    # API calls saved so far, per endpoint
+    def summary(self):
+        with self.lock:
+            counters = {endpoint: dict(values) for endpoint, values in self.counters.items()}
+        return " | ".join(
+            f"{endpoint}: {c['hit']} hits, {c['shared']} shared, {c['miss']} misses "
+            f"({(c['hit'] + c['shared']) / max(1, sum(c.values())):.0%} saved)"
+            for endpoint, c in sorted(counters.items())
+        )
+
+# Cache shared by all the GeckoTerminal lookups of the process
+cache = ResponseCache()
+
+def cached(endpoint, key, fetch, fresh=False):
+    return cache.get(endpoint, key, fetch, fresh)
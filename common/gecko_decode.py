@@ -0,0 +1,268 @@
+"""
+DECODING OF THE GECKOTERMINAL PAYLOADS STRAIGHT INTO TYPED POOL / TOKEN RECORDS HOLDING ONLY THE
+FIELDS WE USE (CREATION TIME, LIQUIDITY, LOCK, PRICES, 24H VOLUME AND TRANSACTIONS, FDV, HOLDERS, X PROFILE).
+WITH msgspec THE UNUSED FIELDS ARE SKIPPED BY THE PARSER AND NEVER BECOME PYTHON OBJECTS, OTHERWISE
+THE DOCUMENT IS PARSED BY orjson (OR THE STANDARD json MODULE) AND PROJECTED
+
+Missing, null and unparsable numbers become NaN (lock: 0 when null), as the try/except blocks did.
+
+Benchmark on recorded new_pools pages:  python gecko_decode.py page1.json page2.json ...
+(default: benchmarks/fixtures/new_pools_page.json, 20 pools with the full GeckoTerminal attribute set)
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, List, TypedDict
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+NAN = float("nan")
+
+# Fast generic parser (bytes or str -> dicts and lists)
+loads = orjson.loads if orjson is not None else json.loads
+BACKEND = "msgspec" if msgspec is not None else "orjson" if orjson is not None else "json"
+
+# Float value of a payload field (None, missing and unparsable values become NaN)
+def _float(value):
+    if value is None:
+        return NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+# Unix time of an ISO 8601 field like pool_created_at (NaN if missing or unparsable)
+def _timestamp(value):
+    try:
+        # GeckoTerminal ends UTC times with 'Z', only parsed by fromisoformat from Python 3.11 on
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        return datetime.fromisoformat(value).timestamp()
+    except (AttributeError, TypeError, ValueError):
+        return NAN
+
+# Id of a JSON:API relationship ('' if missing)
+def _relationship_id(relationships, name):
+    data = (relationships.get(name) or {}).get("data") or {}
+    return data.get("id") or ""
+
+# --- RECORDS --- #
+# Pool (pools/{address}, pools/multi and new_pools items)
+class GeckoPool:
+    __slots__ = ("address", "name", "dex", "base_token", "created_at", "liquidity", "lock", "price", "quote_price",
+                 "volume_h24", "fdv", "buys_h24", "sells_h24")
+
+    def __init__(self, address="", name=None, dex="", base_token="", created_at=NAN, liquidity=NAN, lock=0.0,
+                 price=NAN, quote_price=NAN, volume_h24=NAN, fdv=NAN, buys_h24=0, sells_h24=0):
+        self.address = address
+        self.name = name
+        self.dex = dex
+        self.base_token = base_token    # mint, without the 'solana_' prefix
+        self.created_at = created_at    # pool_created_at (unix time)
+        self.liquidity = liquidity      # reserve_in_usd
+        self.lock = lock                # locked_liquidity_percentage
+        self.price = price              # base_token_price_usd
+        self.quote_price = quote_price  # quote_token_price_usd
+        self.volume_h24 = volume_h24
+        self.fdv = fdv
+        self.buys_h24 = buys_h24
+        self.sells_h24 = sells_h24
+
+    def __repr__(self):
+        return f"GeckoPool({self.address}, {self.name}, liquidity={self.liquidity}, price={self.price})"
+
+# Token info (tokens/{mint}/info)
+class GeckoToken:
+    __slots__ = ("holders", "top_10", "twitter")
+
+    def __init__(self, holders=0, top_10=0, twitter=False):
+        self.holders = holders
+        self.top_10 = top_10            # % of the supply held by the top 10 holders
+        self.twitter = twitter          # X profile linked
+
+    def __repr__(self):
+        return f"GeckoToken(holders={self.holders}, top_10={self.top_10}, twitter={self.twitter})"
+
+# Project a JSON:API pool resource (dict) into a record
+def pool_from_resource(resource):
+    attributes = resource.get("attributes") or {}
+    relationships = resource.get("relationships") or {}
+    transactions = (attributes.get("transactions") or {}).get("h24") or {}
+    raw_lock = attributes.get("locked_liquidity_percentage")
+    return GeckoPool(
+        address=attributes.get("address") or "",
+        name=attributes.get("name"),
+        dex=_relationship_id(relationships, "dex").lower(),
+        base_token=_relationship_id(relationships, "base_token").replace("solana_", ""),
+        created_at=_timestamp(attributes.get("pool_created_at")),
+        liquidity=_float(attributes.get("reserve_in_usd")),
+        lock=0.0 if raw_lock is None else _float(raw_lock),
+        price=_float(attributes.get("base_token_price_usd")),
+        quote_price=_float(attributes.get("quote_token_price_usd")),
+        volume_h24=_float((attributes.get("volume_usd") or {}).get("h24")),
+        fdv=_float(attributes.get("fdv_usd")),
+        buys_h24=transactions.get("buys") or 0,
+        sells_h24=transactions.get("sells") or 0,
+    )
+
+# Project a JSON:API token info resource (dict) into a record
+def token_from_resource(resource):
+    attributes = resource.get("attributes") or {}
+    holders = attributes.get("holders") or {}
+    top_10 = (holders.get("distribution_percentage") or {}).get("top_10")
+    return GeckoToken(
+        holders=holders.get("count") or 0,
+        top_10=0 if top_10 is None else _float(top_10),
+        twitter=bool(attributes.get("twitter_handle")),
+    )
+
+# --- TYPED DECODERS (msgspec: only these keys are decoded, the rest of the document is skipped) --- #
+if msgspec is not None:
+    class _Link(TypedDict, total=False):
+        data: Any
+
+    class _Relationships(TypedDict, total=False):
+        dex: _Link
+        base_token: _Link
+
+    class _Volume(TypedDict, total=False):
+        h24: Any
+
+    class _Transactions(TypedDict, total=False):
+        h24: Any
+
+    class _PoolAttributes(TypedDict, total=False):
+        address: Any
+        name: Any
+        pool_created_at: Any
+        reserve_in_usd: Any
+        locked_liquidity_percentage: Any
+        base_token_price_usd: Any
+        quote_token_price_usd: Any
+        volume_usd: _Volume
+        fdv_usd: Any
+        transactions: _Transactions
+
+    class _PoolResource(TypedDict, total=False):
+        attributes: _PoolAttributes
+        relationships: _Relationships
+
+    class _PoolsDocument(TypedDict, total=False):
+        data: List[_PoolResource]
+
+    class _PoolDocument(TypedDict, total=False):
+        data: _PoolResource
+
+    class _TokenAttributes(TypedDict, total=False):
+        holders: Any
+        twitter_handle: Any
+
+    class _TokenResource(TypedDict, total=False):
+        attributes: _TokenAttributes
+
+    class _TokenDocument(TypedDict, total=False):
+        data: _TokenResource
+
+    _decoders = {"pools": msgspec.json.Decoder(_PoolsDocument), "pool": msgspec.json.Decoder(_PoolDocument),
+                 "token": msgspec.json.Decoder(_TokenDocument)}
+
+# Decode a document with the projection of its kind (documents not matching it, e.g. data: null,
+# go through the generic parser)
+def _decode(body, kind):
+    if msgspec is not None:
+        try:
+            return _decoders[kind].decode(body)
+        except msgspec.DecodeError:
+            pass
+    return loads(body)
+
+# Pools of a new_pools / pools/multi response body
+def decode_pools(body):
+    return [pool_from_resource(resource) for resource in _decode(body, "pools").get("data") or []]
+
+# Pool of a pools/{address} response body (None if the document has no pool)
+def decode_pool(body):
+    resource = _decode(body, "pool").get("data")
+    return pool_from_resource(resource) if resource else None
+
+# Token of a tokens/{mint}/info response body (None if the document has no token)
+def decode_token(body):
+    resource = _decode(body, "token").get("data")
+    return token_from_resource(resource) if resource else None
+
+
+# --- BENCHMARK: FULL DECODE + NESTED WALK VS PROJECTED RECORDS --- #
+# Previous code path: the whole document is decoded and kept, the fields are read from the nested dicts
+def _walk_dicts(body):
+    document = json.loads(body)
+    for pool in document.get("data") or []:
+        attributes = pool["attributes"]
+        pool["relationships"]["dex"]["data"]["id"].lower()
+        _float(attributes.get("reserve_in_usd")), _float(attributes.get("base_token_price_usd"))
+        _float(attributes["volume_usd"].get("h24")), _float(attributes.get("fdv_usd"))
+        (attributes.get("transactions") or {}).get("h24")
+    return document
+
+# Mean seconds per call and bytes still allocated by the result of one call
+def _measure(function, body, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(body)
+    seconds = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    result = function(body)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, retained, peak, result
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or [os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks",
+                                          "fixtures", "new_pools_page.json")]
+    bodies = []
+    for path in paths:
+        with open(path, "rb") as file:
+            bodies.append(file.read())
+    pages, size = len(bodies), sum(len(body) for body in bodies)
+    repeat = max(1, 20000 // pages)
+    print(f"{pages} recorded new_pools page(s), {size / pages / 1024:.1f} KB each, {repeat} decodes per page")
+
+    candidates = [("json + dict walk", _walk_dicts)]
+    if msgspec is not None:
+        candidates.append(("msgspec records", decode_pools))
+    # Projection from the generic parsers (msgspec disabled)
+    def projected(parser):
+        return lambda body: [pool_from_resource(resource) for resource in parser(body).get("data") or []]
+    if orjson is not None:
+        candidates.append(("orjson records", projected(orjson.loads)))
+    candidates.append(("json records", projected(json.loads)))
+
+    baseline = None
+    print(f"\n{'':<18} {'µs/page':>9} {'peak KB':>9} {'kept KB':>9} {'speed-up':>9}")
+    for label, function in candidates:
+        seconds = retained = peak = 0
+        for body in bodies:
+            s, r, p, _ = _measure(function, body, repeat)
+            seconds, retained, peak = seconds + s, retained + r, max(peak, p)
+        baseline = baseline or seconds
+        print(f"{label:<18} {seconds / pages * 1e6:>9.1f} {peak / 1024:>9.1f} {retained / pages / 1024:>9.1f} "
+              f"{baseline / seconds:>8.1f}x")
+
+    # Same values through every decoder (repr: NaN == NaN)
+    def values(pools):
+        return repr([[getattr(pool, field) for field in GeckoPool.__slots__] for pool in pools])
+    for body in bodies:
+        reference = values(pool_from_resource(resource) for resource in json.loads(body)["data"])
+        for label, function in candidates[1:]:
+            assert values(function(body)) == reference, f"{label} decodes differently"
+    print("\nAll decoders return the same records ✅")
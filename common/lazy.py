@@ -0,0 +1,68 @@
+"""
+LAZILY INITIALIZED COMPONENTS: THE RPC CLIENT, THE WALLET, THE MODEL AND THE WEBSOCKET FEEDS ARE BUILT ON
+FIRST USE INSTEAD OF AT IMPORT, SO A RESTART ONLY PAYS FOR WHAT IT TOUCHES. warm_up() BUILDS THE ONES
+NEEDED BEFORE TRADING IN PARALLEL AND STOPS THE STARTUP AT THE FIRST ONE FAILING
+
+Build time of every component: startup_seconds{component=...}
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+import metrics
+
+# Component built once by factory() on the first get() (concurrent callers wait for the same build)
+class Lazy:
+    def __init__(self, name, factory):
+        self.name = name
+        self.factory = factory
+        self.value = None
+        self.ready = False
+        self.lock = threading.Lock()
+
+    def get(self):
+        if self.ready:
+            return self.value
+        with self.lock:
+            if not self.ready:
+                start = time.perf_counter()
+                self.value = self.factory()
+                self.ready = True
+                metrics.observe("startup_seconds", time.perf_counter() - start, component=self.name)
+        return self.value
+
+    # Replace the component (e.g. a new model version)
+    def set(self, value):
+        with self.lock:
+            self.value = value
+            self.ready = True
+
+    # lazy.attribute is get().attribute
+    def __getattr__(self, attribute):
+        if attribute in ("name", "factory", "value", "ready", "lock"):
+            raise AttributeError(attribute)
+        return getattr(self.get(), attribute)
+
+# Run the named warm-up tasks in parallel, report their timings and raise the first error
+def warm_up(tasks):
+    start = time.perf_counter()
+    timings = {}
+    def run(name, task):
+        task_start = time.perf_counter()
+        result = task()
+        timings[name] = time.perf_counter() - task_start
+        return result
+
+    executor = ThreadPoolExecutor(max_workers=max(1, len(tasks)))
+    futures = {name: executor.submit(run, name, task) for name, task in tasks.items()}
+    wait(futures.values(), return_when=FIRST_EXCEPTION)
+    executor.shutdown(wait=False, cancel_futures=True)
+    for name, future in futures.items():
+        if future.done() and future.exception() is not None:
+            raise RuntimeError(f"startup failed while warming up '{name}': {future.exception()}") from future.exception()
+    results = {name: future.result() for name, future in futures.items()}
+    elapsed = time.perf_counter() - start
+    metrics.observe("startup_seconds", elapsed, component="warm_up")
+    print(f"🚀 Ready in {elapsed * 1000:.0f} ms (" +
+          ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in sorted(timings.items(), key=lambda t: -t[1])) + ")")
+    return results
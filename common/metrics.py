@@ -0,0 +1,161 @@
+"""
+LIGHTWEIGHT LATENCY METRICS: ROLLING WINDOWS OF THE LAST SAMPLES OF EVERY TIMED STAGE AND OUTBOUND
+CALL (p50/p95/p99 COMPUTED ONLY WHEN READ), COUNTERS, A PROMETHEUS-FORMAT /metrics ENDPOINT AND A
+PERIODIC ONE-LINE SUMMARY
+
+Recording a sample is a perf_counter() difference, an uncontended lock and a deque append: cheap
+enough for the hot path.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WINDOW = 2048                 # samples kept per series for the quantiles
+QUANTILES = (0.5, 0.95, 0.99)
+NAMESPACE = "patricio"        # prefix of the exported metric names
+
+_series = {}      # (name, labels) -> Series
+_counters = {}    # (name, labels) -> count
+_lock = threading.Lock()
+
+# Rolling window of the last samples of a series, with the all-time count and sum
+class Series:
+    def __init__(self):
+        self.samples = deque(maxlen=WINDOW)
+        self.count = 0
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, value):
+        with self.lock:
+            self.samples.append(value)
+            self.count += 1
+            self.total += value
+
+    # Nearest-rank quantiles of the window
+    def quantiles(self, quantiles=QUANTILES):
+        with self.lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return [float("nan") for _ in quantiles]
+        return [samples[min(len(samples) - 1, int(q * len(samples)))] for q in quantiles]
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+# Record a duration (seconds) or any other sample of a series
+def observe(name, value, **labels):
+    key = _key(name, labels)
+    series = _series.get(key)
+    if series is None:
+        with _lock:
+            series = _series.setdefault(key, Series())
+    series.add(value)
+
+# Add to a counter
+def increment(name, amount=1, **labels):
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+# Time the body of a with block: with timed("stage_seconds", stage="fetch_pool_data"): ...
+@contextmanager
+def timed(name, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+# Proxy timing every method call of an object (e.g. the Solana RPC client: rpc_seconds{method=...})
+class TimedProxy:
+    def __init__(self, target, name, label="method"):
+        self._target = target
+        self._name = name
+        self._label = label
+
+    def __getattr__(self, attribute):
+        value = getattr(self._target, attribute)
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            with timed(self._name, **{self._label: attribute}):
+                return value(*args, **kwargs)
+        return call
+
+# --- EXPORT --- #
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+# Prometheus text format: every series as a summary, every counter as a counter
+def render():
+    with _lock:
+        series = sorted(_series.items())
+        counters = sorted(_counters.items())
+    lines, typed = [], set()
+    for (name, labels), values in series:
+        metric = f"{NAMESPACE}_{name}"
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} summary")
+            typed.add(metric)
+        for q, value in zip(QUANTILES, values.quantiles()):
+            lines.append(f"{metric}{_format_labels(labels, [('quantile', q)])} {value}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {values.total}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {values.count}")
+    for (name, labels), value in counters:
+        metric = f"{NAMESPACE}_{name}"
+        if metric not in typed:
+            lines.append(f"# TYPE {metric} counter")
+            typed.add(metric)
+        lines.append(f"{metric}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+# One line with p50/p95/p99 (ms) of every timed series
+def summary_line():
+    with _lock:
+        series = sorted(_series.items())
+    parts = []
+    for (name, labels), values in series:
+        p50, p95, p99 = (value * 1000 for value in values.quantiles())
+        label = ":".join([name.replace("_seconds", "")] + [str(value) for _, value in labels])
+        parts.append(f"{label} {p50:.0f}/{p95:.0f}/{p99:.0f}ms ({values.count})")
+    return " | ".join(parts)
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("/metrics", ""):
+            self.send_error(404)
+            return
+        body = render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+# Serve /metrics on a local port in a background thread
+def start_http_server(port, host="127.0.0.1"):
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# Print the summary line every interval seconds
+def start_summary(interval):
+    def run():
+        while True:
+            time.sleep(interval)
+            line = summary_line()
+            if line:
+                print(f"📊 p50/p95/p99: {line}")
+    threading.Thread(target=run, daemon=True).start()
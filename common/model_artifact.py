@@ -0,0 +1,179 @@
+"""
+MEMORY-MAPPED MODEL ARTIFACT: THE FLAT FOREST ARRAYS ARE SAVED AS .npy FILES IN A VERSION FOLDER
+AND A SMALL manifest.json (FEATURE ORDER, TRAINING DATA HASH, ACTIVE VERSION) POINTS TO THEM. LOADING
+MAPS THE FILES READ-ONLY, SO STARTUP DOES NOT DEPEND ON THE MODEL SIZE AND EVERY BOT PROCESS SHARES
+THE SAME PAGES. A WATCHER SWAPS IN A NEW VERSION AS SOON AS ITS MANIFEST IS PUBLISHED
+
+Layout:  patricio_model/manifest.json  +  patricio_model/<version>/<array>.npy
+Load time of the pickle, the .npz and the mapped artifact:  python model_artifact.py [patricio.pkl]
+"""
+
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+import numpy as np
+from flat_forest import FlatForest
+
+# Model files written by training/rf_model.py and read by the trading bot (run both from the repository root)
+PICKLE_PATH = "./training/patricio.pkl"
+FLAT_PATH = "./training/patricio.npz"
+MAPPED_DIR = "./training/patricio_model"
+
+MANIFEST_FILE = "manifest.json"
+ARRAYS = ("feature", "threshold", "left", "right", "missing_left", "value", "roots", "classes")
+KEEP_VERSIONS = 3            # older version folders are deleted (processes still mapping them keep their pages)
+WATCH_INTERVAL = 5           # seconds between two checks of the manifest
+
+# Write a new version of the model and publish it by atomically replacing the manifest
+def save_mapped(forest, directory, data_hash=None):
+    version = time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:8]
+    version_dir = os.path.join(directory, version)
+    os.makedirs(version_dir)
+    shapes = {}
+    for name in ARRAYS:
+        array = np.ascontiguousarray(getattr(forest, name))
+        np.save(os.path.join(version_dir, name + ".npy"), array, allow_pickle=False)
+        shapes[name] = list(array.shape)
+    manifest = {
+        "version": version,
+        "feature_names": forest.feature_names,
+        "max_depth": forest.max_depth,
+        "data_hash": data_hash,
+        "created_at": time.time(),
+        "arrays": shapes,
+    }
+    tmp_path = os.path.join(directory, MANIFEST_FILE + ".tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(manifest, file, indent=1)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, os.path.join(directory, MANIFEST_FILE))
+    _prune_versions(directory, version)
+    print(f"Memory-mapped model {version} saved in {directory}")
+    return version
+
+def _prune_versions(directory, current):
+    versions = sorted(name for name in os.listdir(directory) if os.path.isdir(os.path.join(directory, name)))
+    for name in versions[:-KEEP_VERSIONS]:
+        if name != current:
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_FILE)) as file:
+        return json.load(file)
+
+# Map the active version of a model folder (forest.manifest holds the version and the data hash)
+def load_mapped(directory):
+    manifest = read_manifest(directory)
+    version_dir = os.path.join(directory, manifest["version"])
+    arrays = {name: np.load(os.path.join(version_dir, name + ".npy"), mmap_mode="r", allow_pickle=False)
+              for name in ARRAYS}
+    for name, shape in manifest["arrays"].items():
+        if list(arrays[name].shape) != shape:
+            raise ValueError(f"{name}.npy of model {manifest['version']} has shape {arrays[name].shape}, expected {shape}")
+    forest = FlatForest({**arrays, "feature_names": manifest["feature_names"], "max_depth": manifest["max_depth"]})
+    forest.manifest = manifest
+    return forest
+
+# Change stamp of the manifest (a new version replaces the file: new inode and mtime)
+def _stamp(directory):
+    try:
+        stat = os.stat(os.path.join(directory, MANIFEST_FILE))
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+# Poll a model folder and hand every new version to on_swap(forest), from a background thread
+# (the folder and its manifest may not exist yet: the first version published is a new one)
+class ModelWatcher:
+    def __init__(self, directory, on_swap, interval=WATCH_INTERVAL):
+        self.directory = directory
+        self.on_swap = on_swap
+        self.interval = interval
+        self.stamp = _stamp(directory)
+
+    # Load the new version if the manifest changed (a broken version is reported and skipped)
+    def check(self):
+        stamp = _stamp(self.directory)
+        if stamp is None or stamp == self.stamp:
+            return False
+        self.stamp = stamp
+        start = time.perf_counter()
+        try:
+            forest = load_mapped(self.directory)
+        except Exception as e:
+            print(f"❌ New model in {self.directory} not loaded, keeping the current one: {e}")
+            return False
+        self.on_swap(forest)
+        print(f"🔁 Model {forest.manifest['version']} (data {forest.manifest['data_hash']}) swapped in "
+              f"{(time.perf_counter() - start) * 1000:.1f} ms")
+        return True
+
+    def start(self):
+        def run():
+            while True:
+                time.sleep(self.interval)
+                self.check()
+        threading.Thread(target=run, daemon=True).start()
+        return self
+
+
+# --- LOAD TIME: PICKLE VS .npz VS MEMORY-MAPPED --- #
+if __name__ == "__main__":
+    import pickle
+    import tempfile
+    from flat_forest import export_forest, load_forest
+
+    workdir = tempfile.mkdtemp(prefix="model_artifact_")
+    if len(sys.argv) > 1:
+        pickle_path = sys.argv[1]
+    else:
+        # Forest of the size picked by the hyperparameter search on a ~50k rows dataset
+        from sklearn.ensemble import RandomForestClassifier
+        rng = np.random.default_rng(42)
+        X = rng.normal(size=(50_000, 9)).astype(np.float32)
+        y = (X[:, 0] + rng.normal(scale=1.5, size=len(X)) > 1).astype(int)
+        model = RandomForestClassifier(n_estimators=300, min_samples_leaf=1, random_state=42, n_jobs=-1).fit(X, y)
+        pickle_path = os.path.join(workdir, "patricio.pkl")
+        with open(pickle_path, "wb") as file:
+            pickle.dump(model, file)
+
+    with open(pickle_path, "rb") as file:
+        model = pickle.load(file)
+    npz_path = os.path.join(workdir, "patricio.npz")
+    mapped_dir = os.path.join(workdir, "patricio_model")
+    export_forest(model, npz_path)
+    save_mapped(FlatForest.from_model(model), mapped_dir, data_hash="benchmark")
+
+    def load_pickle():
+        with open(pickle_path, "rb") as file:
+            return FlatForest.from_model(pickle.load(file))
+
+    loaders = [("pickle + flatten", load_pickle), (".npz", lambda: load_forest(npz_path)),
+               ("memory-mapped", lambda: load_mapped(mapped_dir))]
+    vector = np.zeros(len(load_mapped(mapped_dir).feature_names), dtype=np.float32)
+    print(f"\nModel: {sum(len(e.tree_.feature) for e in model.estimators_)} nodes in {len(model.estimators_)} trees | "
+          f"pickle {os.path.getsize(pickle_path) / 2**20:.1f} MB")
+    print(f"{'':<18} {'load ms':>9} {'first predict ms':>17}")
+    for label, loader in loaders:
+        loads, firsts = [], []
+        for _ in range(5):
+            start = time.perf_counter()
+            forest = loader()
+            loads.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            forest.predict(vector)
+            firsts.append(time.perf_counter() - start)
+        print(f"{label:<18} {np.median(loads) * 1000:>9.1f} {np.median(firsts) * 1000:>17.2f}")
+
+    # Hot swap: a new version published while a watcher runs
+    swapped = []
+    watcher = ModelWatcher(mapped_dir, swapped.append, interval=0.1).start()
+    time.sleep(0.05)
+    save_mapped(FlatForest.from_model(model), mapped_dir, data_hash="benchmark-v2")
+    time.sleep(0.5)
+    print(f"Hot swap: {'ok, now ' + swapped[-1].manifest['version'] if swapped else 'not detected'}")
@@ -0,0 +1,119 @@
+"""
+INCREMENTAL POLLING OF THE GECKOTERMINAL new_pools LIST: A HIGH-WATER MARK (NEWEST pool_created_at
+SEEN) DECIDES HOW MANY PAGES TO WALK, SO BURSTS OF LISTINGS ARE FOLLOWED PAST PAGE 1 AND QUIET
+PERIODS COST A SINGLE REQUEST. PAGES ARE ASKED CONDITIONALLY (ETag / Last-Modified) AND A PAGE WHOSE
+BODY DID NOT CHANGE SINCE THE LAST POLL IS NOT PARSED AGAIN
+
+A pool is returned when first listed and then again, with its new data, every time it shows up on a
+page read later, until the caller accept()s it (condition 1 passed) or RECHECK_WINDOW expires: a pool
+listed with low or unknown liquidity is re-checked as the page 1 polling did.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict, deque
+import metrics
+import rate_governor
+from gecko_decode import decode_pools
+
+MAX_PAGES = 10          # pages served by new_pools
+SEEN_MEMORY = 2000      # addresses remembered to report every pool once
+RECHECK_WINDOW = 600    # seconds a listed pool not accepted yet is returned again with its new data
+
+class NewPoolsPoller:
+    def __init__(self, url, max_pages=MAX_PAGES, memory=SEEN_MEMORY, recheck_window=RECHECK_WINDOW):
+        self.url = url                  # new_pools url with a {} placeholder for the page number
+        self.max_pages = max_pages
+        self.high_water = None          # newest pool_created_at seen (unix time)
+        self.seen = set()
+        self.seen_order = deque()
+        self.memory = memory
+        self.recheck_window = recheck_window
+        self.waiting = OrderedDict()    # address -> first listed (monotonic), pools not accepted yet
+        self.validators = {}            # page -> conditional request headers
+        self.digests = {}               # page -> digest of the last body parsed
+        self.stats = {"parsed": 0, "unchanged": 0, "not_modified": 0, "error": 0}
+        self.rechecked = 0
+
+    def _count(self, result):
+        self.stats[result] += 1
+        metrics.increment("new_pools_pages_total", result=result)
+
+    def _remember(self, address):
+        self.seen.add(address)
+        self.seen_order.append(address)
+        if len(self.seen_order) > self.memory:
+            self.seen.discard(self.seen_order.popleft())
+
+    # Pools of a page (None if the page did not change or the request failed)
+    def _fetch_page(self, page):
+        response = rate_governor.get(self.url.format(page), headers=self.validators.get(page, {}))
+        if response.status_code == 304:
+            self._count("not_modified")
+            return None
+        if response.status_code != 200:
+            print(f"Error in API request 'Fetch New Pools' (page {page}): {response.status_code}")
+            self._count("error")
+            return None
+
+        validators = {}
+        if response.headers.get("ETag"):
+            validators["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = response.headers["Last-Modified"]
+        self.validators[page] = validators
+        # Same body as the last poll (e.g. served from the API cache): nothing to parse
+        digest = hashlib.blake2b(response.content, digest_size=16).digest()
+        if self.digests.get(page) == digest:
+            self._count("unchanged")
+            return None
+        self.digests[page] = digest
+        self._count("parsed")
+        return decode_pools(response.content)
+
+    # The caller is done with a pool (condition 1 passed): it is not returned again
+    def accept(self, address):
+        self.waiting.pop(address, None)
+
+    def _expire_waiting(self):
+        oldest = time.monotonic() - self.recheck_window
+        while self.waiting and next(iter(self.waiting.values())) < oldest:
+            self.waiting.popitem(last=False)
+        while len(self.waiting) > self.memory:
+            self.waiting.popitem(last=False)
+
+    # Pools listed since the last poll (newest first), then the pools not accepted yet found again on the
+    # pages read. Pages are walked while every pool on them is new and not older than the high-water mark;
+    # the first poll only reads page 1
+    def poll(self):
+        self._expire_waiting()
+        new_pools, rechecked = [], []
+        last_page = self.max_pages if self.high_water is not None else 1
+        for page in range(1, last_page + 1):
+            pools = self._fetch_page(page)
+            if not pools:
+                break
+            fresh = [pool for pool in pools if pool.address not in self.seen]
+            rechecked.extend(pool for pool in pools if pool.address in self.waiting)
+            now = time.monotonic()
+            for pool in fresh:
+                self._remember(pool.address)
+                self.waiting[pool.address] = now
+            new_pools.extend(fresh)
+            # Stop at the first page reaching pools already seen or older than the high-water mark
+            # (pools with an unknown creation time count as old)
+            if self.high_water is None or len(fresh) < len(pools) \
+                    or not all(pool.created_at >= self.high_water for pool in pools):
+                break
+
+        created = [pool.created_at for pool in new_pools if pool.created_at == pool.created_at]
+        if created and (self.high_water is None or max(created) > self.high_water):
+            self.high_water = max(created)
+        if rechecked:
+            self.rechecked += len(rechecked)
+            metrics.increment("new_pools_rechecked_total", len(rechecked))
+        return new_pools + rechecked
+
+    def summary(self):
+        return ", ".join(f"{count} {result}" for result, count in self.stats.items()) + \
+            f" pages, {self.rechecked} pools re-checked"
@@ -0,0 +1,207 @@
+"""
+SHARED RATE GOVERNOR FOR ALL OUTBOUND API CALLS (GECKOTERMINAL, JUPITER, SOLANA RPC): ONE TOKEN
+BUCKET PER HOST, ADAPTIVE BACKOFF ON 429/5xx RESPONSES AND SUPPORT FOR THE Retry-After HEADER
+
+Several processes share the budget of a host with shared_buckets() in the parent process and
+use_buckets() in every child.
+"""
+
+import multiprocessing
+import requests
+import threading
+import metrics
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Requests per second and burst size allowed for each host
+HOST_LIMITS = {
+    "api.geckoterminal.com": (0.5, 5),          # public API: 30 calls/min
+    "lite-api.jup.ag": (1.0, 5),
+    "api.mainnet-beta.solana.com": (4.0, 10),
+    "api.telegram.org": (1.0, 5),
+}
+DEFAULT_LIMIT = (1.0, 5)
+REQUEST_TIMEOUT = 10     # seconds
+MAX_RETRIES = 4          # retries on 429/5xx and connection errors
+MAX_BACKOFF = 60         # max seconds a host is paused without a Retry-After header
+MIN_RATE_FACTOR = 0.1    # the rate of a host is never cut below 10% of its limit
+RECOVERY_STEP = 0.05     # rate factor recovered on every successful call
+
+# Token bucket with an adaptive rate: halved on every throttled response, slowly recovered on success
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.factor = 1.0
+        self.failures = 0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    # Block until a request can be sent
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now >= self.updated:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate * self.factor)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / (self.rate * self.factor)
+                else:
+                    wait = self.updated - now # host paused after a throttled response
+            time.sleep(wait)
+
+    # Slow down after a 429/5xx response or a connection error
+    def penalize(self, retry_after=None):
+        with self.lock:
+            self.failures += 1
+            self.factor = max(MIN_RATE_FACTOR, self.factor / 2)
+            delay = retry_after if retry_after is not None else min(MAX_BACKOFF, 2 ** (self.failures - 1))
+            self.tokens = 0
+            self.updated = max(self.updated, time.monotonic() + delay)
+
+    # Speed up again after a successful response
+    def reward(self):
+        with self.lock:
+            self.failures = 0
+            self.factor = min(1.0, self.factor + RECOVERY_STEP)
+
+# Attribute of a TokenBucket stored in a shared array
+def _shared_field(index):
+    def get(self):
+        return self.state[index]
+    def set(self, value):
+        self.state[index] = value
+    return property(get, set)
+
+# Same bucket with its state in shared memory: every process holding it draws from one budget
+# (time.monotonic() is system-wide, so the refill is consistent across processes)
+class SharedTokenBucket(TokenBucket):
+    tokens = _shared_field(0)
+    factor = _shared_field(1)
+    failures = _shared_field(2)
+    updated = _shared_field(3)
+
+    def __init__(self, rate, capacity, context=multiprocessing):
+        self.rate = rate
+        self.capacity = capacity
+        self.state = context.RawArray("d", [capacity, 1.0, 0, time.monotonic()])
+        self.lock = context.Lock()
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+# Change the limit of a host (requests per second and burst size)
+def configure(host, rate, capacity):
+    with _buckets_lock:
+        HOST_LIMITS[host] = (rate, capacity)
+        _buckets[host] = TokenBucket(rate, capacity)
+
+# Get the bucket of the host of an url
+def get_bucket(url):
+    host = urlparse(url).hostname or url
+    with _buckets_lock:
+        if host not in _buckets:
+            _buckets[host] = TokenBucket(*HOST_LIMITS.get(host, DEFAULT_LIMIT))
+        return _buckets[host]
+
+# Shared buckets of some hosts, created before starting the processes that will use them
+def shared_buckets(hosts, context=multiprocessing):
+    return {host: SharedTokenBucket(*HOST_LIMITS.get(host, DEFAULT_LIMIT), context=context) for host in hosts}
+
+# Make this process draw from shared buckets ({host: SharedTokenBucket})
+def use_buckets(buckets):
+    with _buckets_lock:
+        _buckets.update(buckets)
+
+# Wait for a token before a call that does not go through requests (e.g. the Solana RPC client)
+def throttle(url):
+    get_bucket(url).acquire()
+
+# HTTP response of an error raised by a client library, also when wrapped (solana-py raises
+# SolanaRpcException from the httpx.HTTPStatusError of a 429/5xx)
+def _error_response(error):
+    while error is not None:
+        response = getattr(error, "response", None)
+        if getattr(response, "status_code", None) is not None:
+            return response
+        error = error.__cause__
+    return None
+
+# Client whose method calls draw from the budget of a host: a 429/5xx raised by a call slows the host
+# down like a throttled response of request() (the error is raised again, the caller handles it)
+class GovernedProxy:
+    def __init__(self, target, url):
+        self._target = target
+        self._url = url
+
+    def __getattr__(self, attribute):
+        value = getattr(self._target, attribute)
+        if not callable(value):
+            return value
+
+        def call(*args, **kwargs):
+            bucket = get_bucket(self._url)
+            bucket.acquire()
+            try:
+                result = value(*args, **kwargs)
+            except Exception as e:
+                response = _error_response(e)
+                if response is not None and (response.status_code == 429 or response.status_code >= 500):
+                    metrics.increment("http_errors_total", host=urlparse(self._url).hostname or self._url,
+                                      status=response.status_code)
+                    bucket.penalize(_retry_after(response))
+                raise
+            bucket.reward()
+            return result
+        return call
+
+# Seconds to wait from a Retry-After header (delay in seconds or HTTP date)
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+# Send a request within the budget of its host, retrying throttled and failed calls
+def request(method, url, **kwargs):
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    bucket = get_bucket(url)
+    host = urlparse(url).hostname or url
+    for attempt in range(MAX_RETRIES + 1):
+        bucket.acquire()
+        start = time.perf_counter()
+        try:
+            response = requests.request(method, url, **kwargs)
+        except requests.RequestException:
+            metrics.increment("http_errors_total", host=host, status="exception")
+            bucket.penalize()
+            if attempt == MAX_RETRIES:
+                raise
+            continue
+        metrics.observe("http_request_seconds", time.perf_counter() - start, host=host)
+        if response.status_code == 429 or response.status_code >= 500:
+            metrics.increment("http_errors_total", host=host, status=response.status_code)
+            bucket.penalize(_retry_after(response))
+            if attempt < MAX_RETRIES:
+                continue
+        else:
+            bucket.reward()
+        return response
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
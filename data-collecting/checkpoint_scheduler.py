@@ -0,0 +1,34 @@
+"""
+DEADLINE-ORDERED SCHEDULER FOR PRICE CHECKPOINTS: EVERY TRACKED POOL KEEPS ONLY ITS
+NEXT MISSING CHECKPOINT IN A MIN-HEAP KEYED BY THE TIME THAT CHECKPOINT IS DUE
+"""
+
+import heapq
+import time
+
+# Push the next missing checkpoint of a pool record (returns False when the pool is complete)
+def schedule_pool(schedule, address, record, steps):
+    index = record.next_missing()
+    if index is None:
+        return False
+    heapq.heappush(schedule, (record.timestamp + steps[index][1], address, index))
+    return True
+
+# Push a checkpoint again after a failed sample
+def schedule_retry(schedule, address, index, delay):
+    heapq.heappush(schedule, (time.time() + delay, address, index))
+
+# Pop every checkpoint whose due time has already passed, oldest deadline first
+def pop_due(schedule, now=None):
+    now = time.time() if now is None else now
+    due = []
+    while schedule and schedule[0][0] <= now:
+        due.append(heapq.heappop(schedule))
+    return due
+
+# Seconds to sleep until the next checkpoint is due, never longer than max_wait
+def time_until_next(schedule, max_wait, now=None):
+    if not schedule:
+        return max_wait
+    now = time.time() if now is None else now
+    return min(max(schedule[0][0] - now, 0), max_wait)
@@ -0,0 +1,128 @@
+"""
+CRASH-SAFE STORAGE OF THE COLLECTED DATASET IN SQLITE (WAL MODE): NEW POOLS ARE INSERTED AS
+SINGLE ROWS, PRICE CHECKPOINTS ARE UPDATED IN PLACE AND THE CSV LAYOUT READ BY rf_model.py
+IS EXPORTED ON DEMAND
+
+Hot/cold partitioning: 'pools' only holds the pools with missing checkpoints (the collector's
+working set), complete pools are moved to 'pools_archive' and only read back by the CSV export.
+
+Export the dataset:  python dataset_store.py dataset.db dataset.csv
+"""
+
+import sqlite3
+import csv
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from features import PRICE_COLUMNS
+
+# Dataset schema (same column order as the CSV file)
+INFO_COLUMNS = ["name", "address", "liquidity", "volume", "market_cap",
+                "holders", "top_10", "twitter", "b/s", "v/mc", "price0"]
+LAG_COLUMNS = [column.replace("price_", "lag_") for column in PRICE_COLUMNS]
+CSV_COLUMNS = INFO_COLUMNS + PRICE_COLUMNS + ["timestamp"] + LAG_COLUMNS
+TEXT_COLUMNS = ("name", "address")
+# A pool is complete once every price checkpoint is stored
+COMPLETE = " AND ".join(f'"{column}" IS NOT NULL' for column in PRICE_COLUMNS)
+
+# Open (and create if needed) the dataset database
+def open_store(path):
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    columns = ", ".join(
+        f'"{column}" TEXT PRIMARY KEY' if column == "address" else
+        f'"{column}" TEXT' if column in TEXT_COLUMNS else
+        f'"{column}" REAL'
+        for column in CSV_COLUMNS
+    )
+    conn.execute(f"CREATE TABLE IF NOT EXISTS pools ({columns})")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS pools_archive ({columns})")
+    conn.commit()
+    # Stores created before the archive existed keep their complete pools in 'pools'
+    archive_complete(conn)
+    return conn
+
+# Number of pools in the store (pending and archived)
+def count_pools(conn):
+    return sum(conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ("pools", "pools_archive"))
+
+# Pool already collected (pending or archived)
+def pool_exists(conn, address):
+    return any(conn.execute(f"SELECT 1 FROM {table} WHERE address = ?", (address,)).fetchone()
+               for table in ("pools", "pools_archive"))
+
+# Move every complete pool from the working set to the archive
+def archive_complete(conn):
+    with conn:
+        conn.execute(f"INSERT OR IGNORE INTO pools_archive SELECT * FROM pools WHERE {COMPLETE}")
+        conn.execute(f"DELETE FROM pools WHERE {COMPLETE}")
+
+# Move one pool (its last checkpoint was just stored) to the archive
+def archive_pool(conn, address):
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO pools_archive SELECT * FROM pools WHERE address = ?", (address,))
+        conn.execute("DELETE FROM pools WHERE address = ?", (address,))
+
+# Convert a csv/dict cell into a database value ('' and NaN become NULL)
+def _to_db(column, value):
+    if value in (None, ""):
+        return None
+    if column in TEXT_COLUMNS:
+        return value
+    value = float(value)
+    return None if value != value else value
+
+# Insert a new pool (ignored if the address is already stored)
+def insert_pool(conn, pool):
+    placeholders = ", ".join("?" for _ in CSV_COLUMNS)
+    names = ", ".join(f'"{column}"' for column in CSV_COLUMNS)
+    with conn:
+        conn.execute(f"INSERT OR IGNORE INTO pools ({names}) VALUES ({placeholders})",
+                     [_to_db(column, pool.get(column, "")) for column in CSV_COLUMNS])
+
+# Update some cells of a single pool in place (e.g. one checkpoint and its lag)
+def update_cells(conn, address, cells):
+    for column in cells:
+        if column not in CSV_COLUMNS:
+            raise ValueError(f"Unknown dataset column: {column}")
+    assignments = ", ".join(f'"{column}" = ?' for column in cells)
+    with conn:
+        conn.execute(f"UPDATE pools SET {assignments} WHERE address = ?",
+                     [_to_db(column, value) for column, value in cells.items()] + [address])
+
+# Rows (CSV_COLUMNS order, None for NULL) of the pools with missing checkpoints, the archive is never read
+def pending_rows(conn):
+    names = ", ".join(f'"{column}"' for column in CSV_COLUMNS)
+    return conn.execute(f"SELECT {names} FROM pools")
+
+# One-off migration of an existing dataset.csv into the store
+def import_csv(conn, csv_path):
+    names = ", ".join(f'"{column}"' for column in CSV_COLUMNS)
+    placeholders = ", ".join("?" for _ in CSV_COLUMNS)
+    with open(csv_path, newline='', encoding='utf-8') as file, conn:
+        reader = csv.DictReader(file)
+        conn.executemany(f"INSERT OR IGNORE INTO pools ({names}) VALUES ({placeholders})",
+                         ([_to_db(column, row.get(column, "")) for column in CSV_COLUMNS] for row in reader))
+    archive_complete(conn)
+
+# Export the dataset in the CSV layout (written to a temporary file and atomically replaced)
+def export_csv(conn, csv_path):
+    names = ", ".join(f'"{column}"' for column in CSV_COLUMNS)
+    tmp_path = csv_path + ".tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_COLUMNS)
+        rows = conn.execute(f"SELECT {names} FROM pools UNION ALL SELECT {names} FROM pools_archive ORDER BY timestamp")
+        for row in rows:
+            writer.writerow(["" if value is None else value for value in row])
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, csv_path)
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "dataset.db"
+    csv_path = sys.argv[2] if len(sys.argv) > 2 else "dataset.csv"
+    export_csv(open_store(db_path), csv_path)
+    print(f"Dataset exported to {csv_path}")
@@ -0,0 +1,139 @@
+"""
+COMPACT IN-MEMORY RECORD OF A TRACKED POOL: FIXED SLOTS INSTEAD OF A 57-KEY DICT, THE FEATURES,
+PRICE CHECKPOINTS AND LAGS IN array('d') ROWS (NaN = NOT COLLECTED YET) AND A BITMASK OF THE
+CHECKPOINTS ALREADY STORED. CONVERTS TO AND FROM THE CSV / DATABASE ROW LAYOUT OF dataset_store.py
+
+Memory benchmark:  python pool_record.py 100000
+"""
+
+import csv
+import io
+import sys
+import time
+import tracemalloc
+from array import array
+from dataset_store import INFO_COLUMNS, PRICE_COLUMNS, LAG_COLUMNS, CSV_COLUMNS, pending_rows
+
+FEATURE_COLUMNS = INFO_COLUMNS[2:]          # numeric columns after name and address
+CHECKPOINTS = len(PRICE_COLUMNS)
+COMPLETE_MASK = (1 << CHECKPOINTS) - 1
+NAN = float("nan")
+
+# Float value of a dataset cell ('', None and unparsable values become NaN)
+def _to_float(value):
+    if value is None or value == "":
+        return NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+# CSV cell of a float (NaN is written as an empty cell, as export_csv does for NULL)
+def _to_cell(value):
+    return "" if value != value else value
+
+class PoolRecord:
+    __slots__ = ("name", "address", "timestamp", "features", "prices", "lags", "filled")
+
+    def __init__(self, name, address, timestamp, features, prices=None, lags=None):
+        self.name = name
+        self.address = address
+        self.timestamp = timestamp
+        self.features = array('d', features)
+        self.prices = array('d', prices) if prices is not None else array('d', [NAN]) * CHECKPOINTS
+        self.lags = array('d', lags) if lags is not None else array('d', [NAN]) * CHECKPOINTS
+        # Bit i set: checkpoint i (PRICE_COLUMNS order) is stored
+        self.filled = 0
+        for index, price in enumerate(self.prices):
+            if price == price:
+                self.filled |= 1 << index
+
+    # Record of a dataset dict / csv.DictReader row ('' for the checkpoints not collected yet)
+    @classmethod
+    def from_dict(cls, row):
+        return cls(row.get("name", ""), row["address"], _to_float(row.get("timestamp")),
+                   [_to_float(row.get(column)) for column in FEATURE_COLUMNS],
+                   [_to_float(row.get(column)) for column in PRICE_COLUMNS],
+                   [_to_float(row.get(column)) for column in LAG_COLUMNS])
+
+    # Record of a database row in CSV_COLUMNS order (NULL for the missing cells)
+    @classmethod
+    def from_row(cls, row):
+        return cls.from_dict(dict(zip(CSV_COLUMNS, row)))
+
+    # Row in CSV_COLUMNS order, '' for the missing cells (same layout as dataset.csv)
+    def to_row(self):
+        return ([self.name, self.address] + [_to_cell(value) for value in self.features]
+                + [_to_cell(value) for value in self.prices] + [self.timestamp]
+                + [_to_cell(value) for value in self.lags])
+
+    def to_dict(self):
+        return dict(zip(CSV_COLUMNS, self.to_row()))
+
+    # Store a collected checkpoint and its lag
+    def set_checkpoint(self, index, price, lag):
+        self.prices[index] = price
+        self.lags[index] = lag
+        self.filled |= 1 << index
+
+    # Index of the first checkpoint not collected yet (None once the pool is complete)
+    def next_missing(self):
+        missing = ~self.filled & COMPLETE_MASK
+        return (missing & -missing).bit_length() - 1 if missing else None
+
+    @property
+    def complete(self):
+        return self.filled == COMPLETE_MASK
+
+# Pools with missing checkpoints, by address (the archive is never loaded)
+def load_pools(conn):
+    return {row[1]: PoolRecord.from_row(row) for row in pending_rows(conn)}
+
+# --- BENCHMARK --- #
+# Dataset dict of a pool as the collector kept it before (floats, '' for the missing checkpoints)
+def _sample_dict(i, collected):
+    return {"name": f"POOL{i} / SOL", "address": f"{i:044d}", **{column: 1000.0 + i for column in FEATURE_COLUMNS},
+            **{column: (0.00004 + i * 1e-9 if n < collected else "") for n, column in enumerate(PRICE_COLUMNS)},
+            "timestamp": 1.7e9 + i,
+            **{column: (1.5 if n < collected else "") for n, column in enumerate(LAG_COLUMNS)}}
+
+# Bytes allocated by build() (the objects it returns are kept alive while measuring)
+def _allocated(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = build()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, objects
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    # Pools at every stage of the collection (0 to 22 checkpoints stored), each layout built from scratch
+    dict_bytes, dicts = _allocated(lambda: [_sample_dict(i, i % (CHECKPOINTS + 1)) for i in range(n)])
+    record_bytes, records = _allocated(lambda: [PoolRecord.from_dict(_sample_dict(i, i % (CHECKPOINTS + 1)))
+                                                for i in range(n)])
+    print(f"{n} pools: dicts {dict_bytes / 2**20:.1f} MB ({dict_bytes / n:.0f} B/pool) | "
+          f"records {record_bytes / 2**20:.1f} MB ({record_bytes / n:.0f} B/pool) | "
+          f"{dict_bytes / record_bytes:.1f}x smaller")
+
+    # Next missing checkpoint: scan of the dict keys vs bitmask
+    start = time.perf_counter()
+    for row in dicts:
+        next(((i for i, column in enumerate(PRICE_COLUMNS) if row.get(column, "") == "")), None)
+    dict_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for record in records:
+        record.next_missing()
+    record_seconds = time.perf_counter() - start
+    print(f"Next missing checkpoint of every pool: dicts {dict_seconds * 1000:.0f} ms | "
+          f"records {record_seconds * 1000:.0f} ms")
+
+    # Round trip through the CSV layout
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    writer.writerows(record.to_row() for record in records)
+    buffer.seek(0)
+    reread = [PoolRecord.from_dict(row) for row in csv.DictReader(buffer)]
+    mismatches = sum(a.to_row() != b.to_row() or a.filled != b.filled for a, b in zip(records, reread))
+    print(f"CSV round trip: {len(reread) - mismatches}/{n} records identical")
@@ -0,0 +1,94 @@
+"""
+SHARDED DATA COLLECTOR: A COORDINATOR PROCESS DISCOVERS THE NEW POOLS AND N WORKER PROCESSES TRACK
+THE PRICE CHECKPOINTS, EACH ONE OWNING THE POOLS WHOSE ADDRESS HASHES TO ITS SHARD. ALL OF THEM DRAW
+FROM THE SAME GECKOTERMINAL REQUEST BUDGET AND WRITE INTO THE SAME DATASET STORE
+
+Run:  python sharded_collector.py 4   (number of worker processes)
+"""
+
+import multiprocessing
+import os
+import queue
+import sys
+import time
+import zlib
+from urllib.parse import urlparse
+import get_pools_data as collector
+from checkpoint_scheduler import schedule_pool, time_until_next
+from dataset_store import open_store, count_pools, insert_pool, import_csv, export_csv
+from pool_record import PoolRecord, load_pools
+import rate_governor
+
+WORKERS = 4
+IDLE_WAIT = 5 # max seconds a worker waits for a new pool when no checkpoint is due
+
+# Shard owning a pool (stable across restarts)
+def shard_of(address, shards):
+    return zlib.crc32(address.encode()) % shards
+
+# Worker: track the checkpoints of the pools of one shard
+def run_worker(shard, shards, db_path, inbox, buckets):
+    rate_governor.use_buckets(buckets)
+    conn = open_store(db_path)
+    existing_pools = {address: record for address, record in load_pools(conn).items()
+                      if shard_of(address, shards) == shard}
+    schedule = []
+    for address, record in existing_pools.items():
+        schedule_pool(schedule, address, record, collector.STEPS)
+    print(f"🧩 Shard {shard}/{shards}: tracking {len(existing_pools)} pools")
+
+    while True:
+        collector.update_prices(conn, existing_pools, schedule)
+        # Sleep until the next checkpoint is due, waking up for new pools from the coordinator
+        try:
+            pool = inbox.get(timeout=time_until_next(schedule, IDLE_WAIT))
+            while True:
+                if pool["address"] not in existing_pools:
+                    record = existing_pools[pool["address"]] = PoolRecord.from_dict(pool)
+                    schedule_pool(schedule, pool["address"], record, collector.STEPS)
+                pool = inbox.get_nowait()
+        except queue.Empty:
+            pass
+
+# Start the worker process of a shard
+def start_worker(shard, shards, db_path, inbox, buckets):
+    worker = multiprocessing.Process(target=run_worker, args=(shard, shards, db_path, inbox, buckets),
+                                     name=f"shard-{shard}", daemon=True)
+    worker.start()
+    return worker
+
+# Coordinator: discovery, storage of the new pools and dispatch to the shards
+def main(shards=WORKERS):
+    conn = open_store(collector.DB_FILE)
+    # Migrate the dataset collected before the database was introduced
+    if count_pools(conn) == 0 and os.path.exists(collector.CSV_FILE):
+        import_csv(conn, collector.CSV_FILE)
+
+    # One GeckoTerminal budget for the coordinator and every worker
+    buckets = rate_governor.shared_buckets([urlparse(collector.GECKO_API_BASE).hostname])
+    rate_governor.use_buckets(buckets)
+    inboxes = [multiprocessing.Queue() for _ in range(shards)]
+    workers = [start_worker(shard, shards, collector.DB_FILE, inboxes[shard], buckets) for shard in range(shards)]
+    last_export = time.time()
+    print(f"Welcome back! I start looking for new tokens with {shards} shards 👀")
+
+    while True:
+        for pool in collector.discover_new_pools(conn):
+            insert_pool(conn, pool)
+            inboxes[shard_of(pool["address"], shards)].put(pool)
+
+        # A crashed worker reloads its shard from the store
+        for shard, worker in enumerate(workers):
+            if not worker.is_alive():
+                print(f"⚠️ Shard {shard} worker exited ({worker.exitcode}), restarting it")
+                workers[shard] = start_worker(shard, shards, collector.DB_FILE, inboxes[shard], buckets)
+
+        # Refresh the CSV read by the training script
+        if time.time() - last_export >= collector.EXPORT_INTERVAL:
+            export_csv(conn, collector.CSV_FILE)
+            last_export = time.time()
+
+        time.sleep(collector.DISCOVERY_INTERVAL)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else WORKERS)
@@ -1,11 +1,21 @@
-from openai import OpenAI
 from dotenv import load_dotenv
 import os
+import threading
 
 # Import API key
 load_dotenv(dotenv_path="auth.env")
 agent_key = os.getenv("openai_key")
-client = OpenAI(api_key=agent_key)
+
+# OpenAI client, built on the first boost request (importing openai takes most of the bot startup)
+client = None
+client_lock = threading.Lock()
+def get_client():
+    global client
+    with client_lock:
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI(api_key=agent_key)
+    return client
 
 prompt = """
 Forget all your previous instructions. Given a webpage link, you will only response, if any, with the number of ⚡ present. 
@@ -15,7 +25,9 @@ Please, return only the value requested. If the value is not available, just ret
 
 url = "https://dexscreener.com/solana/{}"
 
-def get_boosts(address):
+# Boosts of a pool as text (timeout: seconds before the request is abandoned, default of the client otherwise)
+def get_boosts(address, timeout=None):
+    client = get_client() if timeout is None else get_client().with_options(timeout=timeout)
     response = client.responses.create(
 
         model="gpt-4o", # update with a newer model here
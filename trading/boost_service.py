@@ -0,0 +1,138 @@
+"""
+BACKGROUND BOOST LOOKUPS: THE ⚡ BOOSTS OF A POOL ARE ASKED TO A BACKEND (THE AI AGENT, OR A LOCAL FAKE)
+ON AN EVENT LOOP OF THEIR OWN, WITH A DEADLINE PER CALL, A CAP ON THE CALLS IN FLIGHT AND A TTL CACHE PER
+POOL ADDRESS. request() RETURNS AT ONCE: THE RESULT IS HANDED TO on_result(address, boosts) WHENEVER IT
+ARRIVES, SO A BUY OR A SELL NEVER WAITS FOR IT
+
+Demo with the fake backend:  python boost_service.py
+"""
+
+import asyncio
+import inspect
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import metrics
+
+DEADLINE = 30        # seconds before a lookup is given up
+MAX_IN_FLIGHT = 2    # backend calls at the same time (the others wait their turn)
+TTL = 600            # seconds a pool's boosts are reused
+
+# Boosts count of a backend answer (the agent returns text like "12")
+def parse_boosts(answer):
+    return int(str(answer).strip() or 0)
+
+class BoostService:
+    # backend(address) -> boosts, a plain function (run in a thread) or a coroutine function
+    def __init__(self, backend, on_result, deadline=DEADLINE, max_in_flight=MAX_IN_FLIGHT, ttl=TTL):
+        self.backend = backend
+        self.on_result = on_result
+        self.deadline = deadline
+        self.ttl = ttl
+        self.max_in_flight = max_in_flight
+        self.cache = {}                 # address -> (expires at, boosts)
+        self.pending = set()            # addresses with a lookup queued or in flight
+        self.lock = threading.Lock()
+        self.stats = {"hit": 0, "shared": 0, "ok": 0, "timeout": 0, "error": 0}
+        self.loop = asyncio.new_event_loop()
+        self.slots = asyncio.Semaphore(max_in_flight)
+        # Blocking backend calls and on_result callbacks run here, never on the event loop
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="boosts")
+        self.callbacks = ThreadPoolExecutor(max_workers=1, thread_name_prefix="boost-results")
+        self.started = False
+
+    def start(self):
+        with self.lock:
+            if not self.started:
+                self.started = True
+                threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        return self
+
+    def _count(self, result):
+        self.stats[result] += 1
+        metrics.increment("boost_lookups_total", result=result)
+
+    # Ask the boosts of a pool (called from the bot threads, returns immediately)
+    def request(self, address):
+        with self.lock:
+            entry = self.cache.get(address)
+            if entry is not None and entry[0] > time.monotonic():
+                self._count("hit")
+                self.callbacks.submit(self._deliver, address, entry[1])
+                return
+            if address in self.pending:
+                self._count("shared")
+                return
+            self.pending.add(address)
+        self.start()
+        asyncio.run_coroutine_threadsafe(self._lookup(address), self.loop)
+
+    async def _call(self, address):
+        if inspect.iscoroutinefunction(self.backend):
+            return await self.backend(address)
+        return await self.loop.run_in_executor(self.executor, self.backend, address)
+
+    async def _lookup(self, address):
+        start = time.perf_counter()
+        try:
+            async with self.slots:
+                boosts = parse_boosts(await asyncio.wait_for(self._call(address), self.deadline))
+        except asyncio.TimeoutError:
+            print(f"⏳ Boosts of {address} not known after {self.deadline}s, lookup given up")
+            result = "timeout"
+        except Exception as e:
+            print(f"❌ Error in 'Get Boosts' for {address}: {e}")
+            result = "error"
+        else:
+            result = "ok"
+            with self.lock:
+                self.cache[address] = (time.monotonic() + self.ttl, boosts)
+                now = time.monotonic()
+                for expired in [key for key, (expires, _) in self.cache.items() if expires <= now]:
+                    del self.cache[expired]
+            self.callbacks.submit(self._deliver, address, boosts)
+        finally:
+            with self.lock:
+                self.pending.discard(address)
+                self._count(result)
+        metrics.observe("boost_seconds", time.perf_counter() - start, result=result)
+
+    def _deliver(self, address, boosts):
+        try:
+            self.on_result(address, boosts)
+        except Exception as e:
+            print(f"❌ Error handling the boosts of {address}: {e}")
+
+    def summary(self):
+        return ", ".join(f"{count} {result}" for result, count in self.stats.items()) + " lookups"
+
+# Local stand-in for the AI agent: fixed answer after a delay (seconds)
+def fake_backend(boosts="3", delay=0.5):
+    async def lookup(address):
+        await asyncio.sleep(delay)
+        return boosts
+    return lookup
+
+
+# --- DEMO: SLOW FAKE BACKEND, DEADLINE, CACHE AND CONCURRENCY CAP --- #
+if __name__ == "__main__":
+    results = []
+    service = BoostService(fake_backend("7", delay=0.5), lambda address, boosts: results.append((address, boosts)),
+                           deadline=2, max_in_flight=2).start()
+    start = time.perf_counter()
+    for i in range(6):
+        service.request(f"POOL{i % 4}")
+    print(f"6 requests (4 pools) queued in {(time.perf_counter() - start) * 1000:.2f} ms")
+    time.sleep(1.2)
+    service.request("POOL0")
+    time.sleep(0.1)
+    print(f"After 1.3s: {len(results)} results | {service.summary()}")
+
+    slow = BoostService(fake_backend("1", delay=5), lambda address, boosts: results.append((address, boosts)),
+                        deadline=0.3).start()
+    slow.request("SLOW")
+    time.sleep(0.5)
+    print(f"Backend slower than the deadline: {slow.summary()}")
@@ -0,0 +1,137 @@
+"""
+BACKGROUND CONFIRMATION OF THE TRANSACTIONS SENT BY THE BOT: ALL OUTSTANDING SIGNATURES ARE
+CHECKED WITH ONE getSignatureStatuses CALL PER TICK (UP TO 256 SIGNATURES PER CALL) AND EVERY
+TRANSACTION ENDS EITHER CONFIRMED OR FAILED
+
+Self-check against a fake RPC client (RPC calls per tick):  python confirmation_tracker.py
+"""
+
+import threading
+import time
+from solders.signature import Signature
+from solders.transaction_status import TransactionConfirmationStatus
+
+MAX_SIGNATURES_PER_CALL = 256 # getSignatureStatuses limit
+TICK_INTERVAL = 2             # seconds between two status checks
+TX_TIMEOUT = 90               # seconds after which a tx still unknown to the cluster is failed (blockhash expired)
+CONFIRMED_STATUSES = (TransactionConfirmationStatus.Confirmed, TransactionConfirmationStatus.Finalized)
+
+# Track sent transactions and call on_confirmed(tx_id, context) / on_failed(tx_id, context, reason)
+class ConfirmationTracker:
+    def __init__(self, client, on_confirmed, on_failed, throttle=None):
+        self.client = client
+        self.on_confirmed = on_confirmed
+        self.on_failed = on_failed
+        self.throttle = throttle # called before every RPC request (rate limiting)
+        self.pending = {}        # tx_id -> {"sent_at": ..., "context": ..., "history": ...}
+        self.lock = threading.Lock()
+
+    # Add a sent transaction (history: sent before a restart, possibly out of the recent status cache of the node)
+    def track(self, tx_id, context, history=False):
+        with self.lock:
+            self.pending[tx_id] = {"sent_at": time.time(), "context": context, "history": history}
+
+    def pending_count(self):
+        with self.lock:
+            return len(self.pending)
+
+    # Check all the outstanding signatures with one RPC call per 256 of them
+    def tick(self):
+        with self.lock:
+            # Transactions to search in the ledger history first, so they share as few calls as possible
+            outstanding = sorted(self.pending.items(), key=lambda item: not item[1]["history"])
+        resolved = []
+
+        for start in range(0, len(outstanding), MAX_SIGNATURES_PER_CALL):
+            chunk = outstanding[start:start + MAX_SIGNATURES_PER_CALL]
+            if self.throttle:
+                self.throttle()
+            try:
+                statuses = self.client.get_signature_statuses([Signature.from_string(tx_id) for tx_id, _ in chunk],
+                                                              search_transaction_history=chunk[0][1]["history"]).value
+            except Exception as e:
+                print(f"❌ Error retrieving signature statuses: {e}")
+                continue
+
+            for (tx_id, entry), status in zip(chunk, statuses):
+                if status is None:
+                    if time.time() - entry["sent_at"] > TX_TIMEOUT:
+                        resolved.append((tx_id, entry, "not found before timeout"))
+                elif status.err is not None:
+                    resolved.append((tx_id, entry, str(status.err)))
+                elif status.confirmation_status in CONFIRMED_STATUSES:
+                    resolved.append((tx_id, entry, None))
+
+        with self.lock:
+            for tx_id, _, _ in resolved:
+                self.pending.pop(tx_id, None)
+        # Callbacks run outside the lock: they may track new transactions (e.g. a resent exit)
+        for tx_id, entry, reason in resolved:
+            try:
+                if reason is None:
+                    self.on_confirmed(tx_id, entry["context"])
+                else:
+                    self.on_failed(tx_id, entry["context"], reason)
+            except Exception as e:
+                print(f"❌ Error handling status of {tx_id}: {e}")
+
+    # Check statuses forever
+    def run(self):
+        while True:
+            if self.pending_count():
+                self.tick()
+            time.sleep(TICK_INTERVAL)
+
+    # Run in a daemon thread
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+
+# --- SELF-CHECK: ONE getSignatureStatuses CALL PER TICK FOR UP TO 256 PENDING TRANSACTIONS --- #
+if __name__ == "__main__":
+    from types import SimpleNamespace
+
+    # Fake Solana client: every call is recorded, the statuses come from a dict (missing: unknown tx)
+    class FakeClient:
+        def __init__(self, statuses):
+            self.statuses = statuses
+            self.calls = []
+
+        def get_signature_statuses(self, signatures, search_transaction_history=False):
+            self.calls.append((len(signatures), search_transaction_history))
+            return SimpleNamespace(value=[self.statuses.get(str(signature)) for signature in signatures])
+
+    confirmed = SimpleNamespace(err=None, confirmation_status=TransactionConfirmationStatus.Confirmed)
+    processed = SimpleNamespace(err=None, confirmation_status=TransactionConfirmationStatus.Processed)
+    failed = SimpleNamespace(err="InstructionError", confirmation_status=TransactionConfirmationStatus.Confirmed)
+
+    for count in (1, 5, 256, 600):
+        tx_ids = [str(Signature.new_unique()) for _ in range(count)]
+        # A third of the txs confirmed, a third failed, the rest still processing
+        statuses = {tx_id: (confirmed, failed, processed)[i % 3] for i, tx_id in enumerate(tx_ids)}
+        results = {"confirmed": [], "failed": []}
+        client = FakeClient(statuses)
+        tracker = ConfirmationTracker(client, lambda tx_id, context: results["confirmed"].append(tx_id),
+                                      lambda tx_id, context, reason: results["failed"].append(tx_id))
+        for tx_id in tx_ids:
+            tracker.track(tx_id, {"type": "buy"})
+        tracker.tick()
+
+        expected_calls = -(-count // MAX_SIGNATURES_PER_CALL)
+        assert len(client.calls) == expected_calls, (count, client.calls)
+        assert sum(size for size, _ in client.calls) == count
+        assert len(results["confirmed"]) == len(tx_ids[0::3]) and len(results["failed"]) == len(tx_ids[1::3])
+        assert tracker.pending_count() == len(tx_ids[2::3])
+        print(f"{count:>4} pending txs: {len(client.calls)} getSignatureStatuses call(s) "
+              f"{[size for size, _ in client.calls]} | {len(results['confirmed'])} confirmed, "
+              f"{len(results['failed'])} failed, {tracker.pending_count()} still pending")
+
+    # Txs recovered after a restart are searched in the ledger history, grouped in the first call(s)
+    client = FakeClient({})
+    tracker = ConfirmationTracker(client, lambda *args: None, lambda *args: None)
+    for i in range(300):
+        tracker.track(str(Signature.new_unique()), {"type": "buy"}, history=i < 10)
+    tracker.tick()
+    assert client.calls == [(256, True), (44, False)], client.calls
+    print(f"300 pending txs, 10 recovered: calls {client.calls}")
+    print("\nConfirmation tracker self-check passed ✅")
@@ -0,0 +1,149 @@
+"""
+POOL DISCOVERY FROM ON-CHAIN LOGS: logsSubscribe ON THE PUMPSWAP PROGRAM SEES EVERY CreatePool
+INSTRUCTION (ALSO WHEN CALLED BY THE PUMP.FUN MIGRATION) AS SOON AS ITS TX IS CONFIRMED, AND EMITS
+THE SAME CANDIDATE RECORD BUILT FROM THE GECKOTERMINAL new_pools PAGE
+
+Time-to-detection on a recording:  python pool_discovery.py [recording.jsonl transactions.json]
+(ws_replay.py format, logsNotification lines with extra "pool" and "base_mint" keys, and the getTransaction
+answers of every signature in order; default: benchmarks/fixtures/logs_session.jsonl and pool_creation_txs.json,
+generated by benchmarks/ws_fixtures.py)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from gecko_decode import GeckoPool
+
+PUMPSWAP_PROGRAM_ID = "pAMMBay6oceH9fJKBRHGP5D4bD4sWpmSwMn52FMfXEA"
+CREATE_POOL_LOG = "Program log: Instruction: CreatePool"
+CREATE_POOL_DISCRIMINATOR = bytes([233, 146, 209, 142, 207, 104, 64, 188])
+# create_pool accounts: pool, global_config, creator, base_mint, ...
+POOL_ACCOUNT_INDEX = 0
+BASE_MINT_ACCOUNT_INDEX = 3
+TX_FETCH_RETRIES = 5   # the tx may not be served yet right after the log notification
+TX_FETCH_DELAY = 0.5
+RECONNECT_DELAY = 2
+B58_ALPHABET = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+
+# Decode base58 instruction data
+def b58decode(value):
+    number = 0
+    for char in value:
+        number = number * 58 + B58_ALPHABET.index(char)
+    data = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    return bytes(len(value) - len(value.lstrip("1"))) + data
+
+# Log notification of a successful pool creation
+def is_pool_creation(value):
+    return value.get("err") is None and CREATE_POOL_LOG in value.get("logs", [])
+
+# Pool and base mint created by a tx (rpc_request(method, params) returns the JSON-RPC result)
+def fetch_pool_creation(rpc_request, signature):
+    for attempt in range(TX_FETCH_RETRIES):
+        tx = rpc_request("getTransaction", [signature, {"encoding": "json", "commitment": "confirmed",
+                                                        "maxSupportedTransactionVersion": 0}])
+        if tx:
+            break
+        time.sleep(TX_FETCH_DELAY)
+    else:
+        return None
+
+    message, meta = tx["transaction"]["message"], tx.get("meta") or {}
+    loaded = meta.get("loadedAddresses") or {}
+    keys = message["accountKeys"] + loaded.get("writable", []) + loaded.get("readonly", [])
+    # The migration from pump.fun creates the pool through an inner instruction
+    instructions = message["instructions"] + [
+        instruction for inner in meta.get("innerInstructions") or [] for instruction in inner["instructions"]
+    ]
+    for instruction in instructions:
+        if keys[instruction["programIdIndex"]] != PUMPSWAP_PROGRAM_ID:
+            continue
+        if b58decode(instruction["data"])[:8] == CREATE_POOL_DISCRIMINATOR:
+            accounts = instruction["accounts"]
+            return keys[accounts[POOL_ACCOUNT_INDEX]], keys[accounts[BASE_MINT_ACCOUNT_INDEX]]
+    return None
+
+# Same record as a GeckoTerminal new_pools item (liquidity is unknown until enrichment)
+def candidate_pool(pool_address, base_mint):
+    return GeckoPool(address=pool_address, dex="pumpswap", base_token=base_mint)
+
+# Websocket subscription to the PumpSwap logs; on_candidate(pool, detected_at) for every new pool
+class LogsDiscovery:
+    def __init__(self, ws_url, resolve_creation, on_candidate):
+        self.ws_url = ws_url
+        self.resolve_creation = resolve_creation # signature -> (pool address, base mint) or None
+        self.on_candidate = on_candidate
+        self.loop = asyncio.new_event_loop()
+
+    def start(self):
+        threading.Thread(target=self.loop.run_until_complete, args=(self._run(),), daemon=True).start()
+
+    async def _run(self):
+        import websockets # only loaded when the discovery starts
+        while True:
+            try:
+                async with websockets.connect(self.ws_url) as ws:
+                    await ws.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "logsSubscribe",
+                                              "params": [{"mentions": [PUMPSWAP_PROGRAM_ID]}, {"commitment": "confirmed"}]}))
+                    async for raw in ws:
+                        message = json.loads(raw)
+                        if message.get("method") != "logsNotification":
+                            continue
+                        value = message["params"]["result"]["value"]
+                        if is_pool_creation(value):
+                            # getTransaction is blocking: resolve out of the websocket loop
+                            self.loop.run_in_executor(None, self._resolve, value["signature"])
+            except Exception as e:
+                print(f"❌ Logs discovery connection error: {e}")
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def _resolve(self, signature):
+        try:
+            created = self.resolve_creation(signature)
+        except Exception as e:
+            print(f"❌ Error resolving pool creation {signature}: {e}")
+            return
+        if created:
+            self.on_candidate(candidate_pool(*created), time.time())
+
+
+# --- REPLAY HARNESS: TIME-TO-DETECTION --- #
+if __name__ == "__main__":
+    from ws_replay import load_recording, serve_replay
+
+    fixtures = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "fixtures")
+    recording_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(fixtures, "logs_session.jsonl")
+    transactions_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(fixtures, "pool_creation_txs.json")
+    records = load_recording(recording_path)
+    with open(transactions_path) as f:
+        transactions = json.load(f)
+    creations = {record["result"]["value"]["signature"]: (record["pool"], record["base_mint"])
+                 for record in records if "pool" in record}
+    sent, detected, calls = [], {}, []
+
+    # Fake RPC: the recorded getTransaction answers of a signature in order (the last one repeated)
+    def rpc_request(method, params):
+        calls.append(params[0])
+        answers = transactions.get(params[0], [None])
+        return answers[min(calls.count(params[0]), len(answers)) - 1]
+    server_loop = asyncio.new_event_loop()
+    server_loop.run_until_complete(serve_replay(records, port=8902, sent_log=sent))
+    threading.Thread(target=server_loop.run_forever, daemon=True).start()
+
+    discovery = LogsDiscovery("ws://127.0.0.1:8902", lambda signature: fetch_pool_creation(rpc_request, signature),
+                              lambda pool, at: detected.setdefault(pool.address, (pool.base_token, at)))
+    discovery.start()
+    time.sleep(sum(record.get("delay", 0) for record in records) + 2)
+
+    # Pool and mint parsed from the transactions must be the recorded ones
+    expected = {pool: base_mint for pool, base_mint in creations.values()}
+    wrong = [pool for pool, (base_mint, _) in detected.items() if expected.get(pool) != base_mint]
+    delays = sorted(detected[record["pool"]][1] - sent_at for record, sent_at in sent if record.get("pool") in detected)
+    print(f"Detected {len(detected)}/{len(creations)} pools ({len(wrong)} with a wrong pool or mint) | "
+          f"{len(calls)} getTransaction calls for {len(set(calls))} signatures")
+    if delays:
+        print(f"Time-to-detection: p50 {delays[len(delays) // 2] * 1000:.1f} ms | max {delays[-1] * 1000:.1f} ms")
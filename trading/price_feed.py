@@ -0,0 +1,223 @@
+"""
+STREAMING PRICE FEED FROM PUMPSWAP POOL RESERVES: THE BASE/QUOTE VAULTS OF EVERY WATCHED POOL ARE
+SUBSCRIBED WITH accountSubscribe OVER THE SOLANA WEBSOCKET, THE PRICE IS COMPUTED LOCALLY FROM THE
+RESERVES AND EVERY CHANGE IS PUSHED TO on_tick(pool_address, price_usd)
+
+Exit latency of the feed vs the GeckoTerminal polling on a recorded vault session:
+python price_feed.py [--indexer-lag 5 --poll-interval 2]   (default: benchmarks/fixtures/account_session.jsonl
+and price_pool_accounts.json generated by benchmarks/ws_fixtures.py, replayed by ws_replay.py)
+"""
+
+import asyncio
+import base64
+import itertools
+import json
+import threading
+from solders.pubkey import Pubkey
+from token_accounts import decode_token_amount
+
+RECONNECT_DELAY = 2 # seconds before reconnecting a dropped websocket
+# PumpSwap pool account layout: discriminator (8), bump (1), index (2), creator, base_mint, quote_mint,
+# lp_mint, pool_base_token_account, pool_quote_token_account (32 bytes each)
+BASE_MINT_OFFSET = 43
+QUOTE_MINT_OFFSET = 75
+BASE_VAULT_OFFSET = 139
+QUOTE_VAULT_OFFSET = 171
+# SPL mint layout: mint authority option (36), supply (8), decimals (1)
+DECIMALS_OFFSET = 44
+
+# Read a pubkey from account data
+def _pubkey_at(data, offset):
+    return str(Pubkey.from_bytes(data[offset:offset + 32]))
+
+# Vaults, decimals and current reserves of a PumpSwap pool (2 RPC calls)
+def resolve_pool(client, pool_address, throttle=None):
+    if throttle:
+        throttle()
+    pool_data = bytes(client.get_multiple_accounts([Pubkey.from_string(pool_address)]).value[0].data)
+    pool = {
+        "base_vault": _pubkey_at(pool_data, BASE_VAULT_OFFSET),
+        "quote_vault": _pubkey_at(pool_data, QUOTE_VAULT_OFFSET),
+    }
+    accounts = [_pubkey_at(pool_data, BASE_MINT_OFFSET), _pubkey_at(pool_data, QUOTE_MINT_OFFSET),
+                pool["base_vault"], pool["quote_vault"]]
+    if throttle:
+        throttle()
+    base_mint, quote_mint, base_vault, quote_vault = [
+        bytes(info.data) for info in client.get_multiple_accounts([Pubkey.from_string(a) for a in accounts]).value
+    ]
+    pool["base_decimals"] = base_mint[DECIMALS_OFFSET]
+    pool["quote_decimals"] = quote_mint[DECIMALS_OFFSET]
+    pool["base_reserve"] = decode_token_amount(base_vault)
+    pool["quote_reserve"] = decode_token_amount(quote_vault)
+    return pool
+
+# Price of the base token in quote tokens from the pool reserves
+def reserves_price(pool):
+    if not pool["base_reserve"]:
+        return None
+    base = pool["base_reserve"] / 10 ** pool["base_decimals"]
+    quote = pool["quote_reserve"] / 10 ** pool["quote_decimals"]
+    return quote / base
+
+# Websocket subscriptions to the vaults of the watched pools, run in its own thread and event loop
+class PoolPriceFeed:
+    def __init__(self, ws_url, client, on_tick, throttle=None):
+        self.ws_url = ws_url
+        self.client = client
+        self.on_tick = on_tick
+        self.throttle = throttle
+        self.quote_price_usd = None # USD price of the quote token (SOL), refreshed by the bot
+        self.pools = {}             # pool address -> vaults, decimals and reserves
+        self.vaults = {}            # vault -> (pool address, "base_reserve" | "quote_reserve")
+        self.subscriptions = {}     # subscription id -> vault
+        self.requests = {}          # request id -> vault waiting for its subscription id
+        self.request_ids = itertools.count(1)
+        self.loop = asyncio.new_event_loop()
+        self.ws = None
+
+    def start(self):
+        threading.Thread(target=self.loop.run_until_complete, args=(self._run(),), daemon=True).start()
+
+    def set_quote_price(self, price_usd):
+        self.quote_price_usd = price_usd
+
+    # Start streaming the price of a pool (called from the bot threads)
+    def watch(self, pool_address):
+        if pool_address in self.pools:
+            return
+        pool = resolve_pool(self.client, pool_address, self.throttle)
+        asyncio.run_coroutine_threadsafe(self._add_pool(pool_address, pool), self.loop)
+
+    # Stop streaming the price of a pool
+    def unwatch(self, pool_address):
+        asyncio.run_coroutine_threadsafe(self._remove_pool(pool_address), self.loop)
+
+    async def _add_pool(self, pool_address, pool):
+        self.pools[pool_address] = pool
+        self.vaults[pool["base_vault"]] = (pool_address, "base_reserve")
+        self.vaults[pool["quote_vault"]] = (pool_address, "quote_reserve")
+        for vault in (pool["base_vault"], pool["quote_vault"]):
+            await self._subscribe(vault)
+
+    async def _remove_pool(self, pool_address):
+        pool = self.pools.pop(pool_address, None)
+        if pool is None:
+            return
+        for vault in (pool["base_vault"], pool["quote_vault"]):
+            self.vaults.pop(vault, None)
+            for subscription, subscribed_vault in list(self.subscriptions.items()):
+                if subscribed_vault == vault:
+                    del self.subscriptions[subscription]
+                    await self._send("accountUnsubscribe", [subscription])
+
+    async def _subscribe(self, vault):
+        request_id = await self._send("accountSubscribe", [vault, {"encoding": "base64", "commitment": "processed"}])
+        if request_id is not None:
+            self.requests[request_id] = vault
+
+    async def _send(self, method, params):
+        if self.ws is None:
+            return None # subscribed again on (re)connection
+        request_id = next(self.request_ids)
+        await self.ws.send(json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}))
+        return request_id
+
+    # Keep the websocket open, subscribing all the vaults again after every reconnection
+    async def _run(self):
+        import websockets # only loaded when the feed starts
+        while True:
+            try:
+                async with websockets.connect(self.ws_url) as ws:
+                    self.ws = ws
+                    self.subscriptions.clear()
+                    self.requests.clear()
+                    for vault in list(self.vaults):
+                        await self._subscribe(vault)
+                    async for raw in ws:
+                        self._handle(json.loads(raw))
+            except Exception as e:
+                print(f"❌ Price feed connection error: {e}")
+            self.ws = None
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def _handle(self, message):
+        # Subscription confirmed
+        if "id" in message:
+            vault = self.requests.pop(message["id"], None)
+            if vault is not None and "result" in message:
+                self.subscriptions[message["result"]] = vault
+            return
+        if message.get("method") != "accountNotification":
+            return
+        params = message["params"]
+        vault = self.subscriptions.get(params["subscription"])
+        if vault not in self.vaults:
+            return
+        pool_address, reserve = self.vaults[vault]
+        pool = self.pools[pool_address]
+        pool[reserve] = decode_token_amount(base64.b64decode(params["result"]["value"]["data"][0]))
+        price = reserves_price(pool)
+        if price is not None and self.quote_price_usd:
+            try:
+                self.on_tick(pool_address, price * self.quote_price_usd)
+            except Exception as e:
+                print(f"❌ Error handling price tick of {pool_address}: {e}")
+
+
+# --- REPLAY HARNESS: EXIT LATENCY OF THE FEED VS THE POLLING FALLBACK --- #
+if __name__ == "__main__":
+    import argparse
+    import os
+    import time
+    from types import SimpleNamespace
+    from ws_replay import load_recording, serve_replay
+
+    fixtures = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "benchmarks", "fixtures")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recording", default=os.path.join(fixtures, "account_session.jsonl"))
+    parser.add_argument("--accounts", default=os.path.join(fixtures, "price_pool_accounts.json"),
+                        help="pool, mint and vault accounts (base64) read before subscribing")
+    parser.add_argument("--indexer-lag", type=float, default=5, help="assumed GeckoTerminal indexing delay (s)")
+    parser.add_argument("--poll-interval", type=float, default=2, help="seconds between two monitor passes")
+    parser.add_argument("--quote-price", type=float, default=150, help="SOL price in USD")
+    args = parser.parse_args()
+
+    records = load_recording(args.recording)
+    with open(args.accounts) as f:
+        recorded = json.load(f)
+
+    # Fake RPC client serving the recorded accounts to resolve_pool
+    class FakeClient:
+        def get_multiple_accounts(self, pubkeys):
+            return SimpleNamespace(value=[SimpleNamespace(data=base64.b64decode(recorded["accounts"][str(key)]))
+                                          for key in pubkeys])
+
+    pool_address = recorded["pool"]
+    entry = reserves_price(resolve_pool(FakeClient(), pool_address)) * args.quote_price
+    ticks, sent = [], []
+    server_loop = asyncio.new_event_loop()
+    server_loop.run_until_complete(serve_replay(records, port=8903, sent_log=sent))
+    threading.Thread(target=server_loop.run_forever, daemon=True).start()
+
+    feed = PoolPriceFeed("ws://127.0.0.1:8903", FakeClient(), lambda pool, price: ticks.append((time.time(), price)))
+    feed.set_quote_price(args.quote_price)
+    feed.start()
+    feed.watch(pool_address)
+    time.sleep(sum(record.get("delay", 0) for record in records) + 1)
+
+    # First update putting the price at 2x (same rule as trading_bot.exit_reason)
+    crossing = next((record for record in records if record.get("price", 0) * args.quote_price >= 2 * entry), None)
+    crossing_sent = next((sent_at for record, sent_at in sent if record is crossing), None)
+    exit_tick = next((at for at, price in ticks if price >= 2 * entry), None)
+    last_price = records[-1]["price"] * args.quote_price
+    print(f"{len(sent)} vault updates replayed, {len(ticks)} ticks | last tick {ticks[-1][1]:.10f} USD "
+          f"(recorded {last_price:.10f})" if ticks else "No tick received")
+    if crossing_sent is None or exit_tick is None:
+        print("The price never reached 2x in the replay")
+    else:
+        feed_latency = exit_tick - crossing_sent
+        # Polling: the crossing is indexed after the lag and seen by the next monitor pass
+        print(f"2x exit seen by the feed {feed_latency * 1000:.1f} ms after the vault update | polling: "
+              f"{args.indexer_lag + args.poll_interval / 2:.1f} s on average, {args.indexer_lag + args.poll_interval:.1f} s "
+              f"at worst (indexer lag {args.indexer_lag:.0f} s assumed + {args.poll_interval:.0f} s interval)")
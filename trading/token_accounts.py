@@ -0,0 +1,42 @@
+"""
+TOKEN ACCOUNTS OF THE WALLET: ASSOCIATED TOKEN ACCOUNTS ARE DERIVED LOCALLY (NO RPC CALL) WHEN A
+BUY IS MADE, AND THE BALANCES OF MANY ACCOUNTS ARE READ WITH ONE getMultipleAccounts CALL AND
+DECODED LOCALLY FROM THE SPL TOKEN ACCOUNT LAYOUT
+"""
+
+from solders.pubkey import Pubkey
+
+TOKEN_PROGRAM_ID = Pubkey.from_string("TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA")
+TOKEN_2022_PROGRAM_ID = Pubkey.from_string("TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb")
+ASSOCIATED_TOKEN_PROGRAM_ID = Pubkey.from_string("ATokenGPvbdGVxr1b2hvZbsiqW5xWH25efTNsLJA8knL")
+MAX_ACCOUNTS_PER_CALL = 100 # getMultipleAccounts limit
+# SPL token account layout: mint (32 bytes), owner (32 bytes), amount (u64 little endian)
+AMOUNT_OFFSET = 64
+
+# Associated token accounts of a mint for both token programs (the mint may use either of them)
+def derive_token_accounts(owner, mint):
+    owner = Pubkey.from_string(owner) if isinstance(owner, str) else owner
+    mint = Pubkey.from_string(mint) if isinstance(mint, str) else mint
+    return [
+        str(Pubkey.find_program_address([bytes(owner), bytes(program), bytes(mint)], ASSOCIATED_TOKEN_PROGRAM_ID)[0])
+        for program in (TOKEN_PROGRAM_ID, TOKEN_2022_PROGRAM_ID)
+    ]
+
+# Raw token amount of an encoded token account (None if the data is not a token account)
+def decode_token_amount(data):
+    if len(data) < AMOUNT_OFFSET + 8:
+        return None
+    return int.from_bytes(data[AMOUNT_OFFSET:AMOUNT_OFFSET + 8], "little")
+
+# Raw balances of many token accounts ({account: amount}, 0 for accounts that do not exist)
+def fetch_token_balances(client, accounts, throttle=None):
+    accounts = list(dict.fromkeys(accounts))
+    balances = {}
+    for start in range(0, len(accounts), MAX_ACCOUNTS_PER_CALL):
+        chunk = accounts[start:start + MAX_ACCOUNTS_PER_CALL]
+        if throttle:
+            throttle()
+        infos = client.get_multiple_accounts([Pubkey.from_string(account) for account in chunk]).value
+        for account, info in zip(chunk, infos):
+            balances[account] = (decode_token_amount(bytes(info.data)) or 0) if info is not None else 0
+    return balances
@@ -1,32 +1,54 @@
 # Import libraries
-import requests
 import json
+import math
 import time
 import os
 import pickle
-import pandas as pd
 import base64
 import csv
-from solana.rpc.api import Client
+import sys
+import queue
+import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from solders.transaction import VersionedTransaction
 from solana.rpc.types import TxOpts
-from solana.rpc.types import TokenAccountOpts
 from datetime import datetime, timezone
 from solders.keypair import Keypair
-from solders.pubkey import Pubkey
 from solders import message
 from solana.rpc.commitment import Processed
 from dotenv import load_dotenv
 from ai_agent import get_boosts
+from boost_service import BoostService
+from confirmation_tracker import ConfirmationTracker
+from token_accounts import derive_token_accounts, fetch_token_balances
+from price_feed import PoolPriceFeed
+from pool_discovery import LogsDiscovery, fetch_pool_creation
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import rate_governor
+import metrics
+from lazy import Lazy, warm_up
+from gecko_cache import cached
+from gecko_decode import GeckoPool, GeckoToken, decode_pool, decode_token
+from pool_poller import NewPoolsPoller
+from gecko_batch import GECKO_API_BASE, fetch_pools_multi, pool_price
+from flat_forest import FlatForest, load_forest
+from model_artifact import FLAT_PATH, MANIFEST_FILE, MAPPED_DIR, PICKLE_PATH, ModelWatcher, load_mapped
+from features import pool_liquidity_lock, parse_features, feature_vector
 
 # === CONFIG ===
 load_dotenv(dotenv_path="auth.env")
 PRIVATE_KEY_B64 = os.getenv("PRIVATE_KEY_B64") # Wallet private key in base64
-# Solana API
-RPC_URL = "https://api.mainnet-beta.solana.com"
-NEW_POOLS_API = "https://api.geckoterminal.com/api/v2/networks/solana/new_pools?page=1"
-POOL_DATA_API = "https://api.geckoterminal.com/api/v2/networks/solana/pools/{}"
-TOKEN_INFO_API = "https://api.geckoterminal.com/api/v2/networks/solana/tokens/{}/info"
+# Solana API (RPC_URL, RPC_WS_URL and JUPITER_API_BASE can point to the benchmark mock server)
+RPC_URL = os.getenv("RPC_URL", "https://api.mainnet-beta.solana.com")
+RPC_WS_URL = os.getenv("RPC_WS_URL", "wss://api.mainnet-beta.solana.com")
+NEW_POOLS_API = GECKO_API_BASE + "/networks/solana/new_pools?page={}"
+POOL_DATA_API = GECKO_API_BASE + "/networks/solana/pools/{}"
+TOKEN_INFO_API = GECKO_API_BASE + "/networks/solana/tokens/{}/info"
+# Jupiter API
+JUPITER_API_BASE = os.getenv("JUPITER_API_BASE", "https://lite-api.jup.ag/swap/v1").rstrip("/")
+JUPITER_QUOTE_API = JUPITER_API_BASE + "/quote"
+JUPITER_SWAP_API = JUPITER_API_BASE + "/swap"
 # Telegram login
 TELEGRAM_BOT_TOKEN = "yourbottoken"
 TELEGRAM_CHANNEL = "@yourchannelname"
@@ -34,13 +56,56 @@ TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessag
 # General variable
 LIQUIDITY_THRESHOLD = 9999
 LOCKED_LIQUIDITY_THRESHOLD = 89
+DEXES = ('pumpswap',) # DEX ids traded (same as the collector)
 INVESTMENT_AMOUNT_SOL = 0.01
+POLL_INTERVAL = 2 # seconds between two new pools requests (API calls are paced by rate_governor)
+MONITOR_INTERVAL = 2 # seconds between two checks of the open positions
+# Pipeline settings: discovery → enrich → score → execute
+QUEUE_SIZE = 50      # max candidates waiting in front of each stage
+ENRICH_WORKERS = 4
+SCORE_WORKERS = 1
+EXECUTE_WORKERS = 2
+# Speculative Jupiter quote requested in parallel with enrichment and scoring
+PREFETCH_WORKERS = 4
+PREFETCH_SWAP_TX = True # also build the swap tx before the prediction
+QUOTE_TTL = 10          # seconds a prefetched quote/tx can be used
+WSOL_MINT = "So11111111111111111111111111111111111111112"
+MAX_EXIT_ATTEMPTS = 3 # sells re-quoted and resent when their tx fails
+STREAM_PRICES = True  # exits driven by on-chain reserves (GeckoTerminal polling stays as fallback)
+EXIT_WORKERS = 2
+LOG_DISCOVERY = True  # detect pools from PumpSwap logs (GeckoTerminal new_pools polling stays as fallback)
+ENRICH_RETRIES = 5    # pools detected on-chain may not be indexed by GeckoTerminal yet
+ENRICH_RETRY_DELAY = 3
 POSITIONS_FILE = "active_positions.json"
-MODEL_PATH = "./training/patricio.pkl"
+MODEL_PATH = PICKLE_PATH
+FLAT_MODEL_PATH = FLAT_PATH # exported by rf_model.py, preferred over the pickle
+MAPPED_MODEL_DIR = MAPPED_DIR # memory-mapped versions exported by rf_model.py, preferred over both
+MODEL_WATCH_INTERVAL = 5 # seconds between two checks for a new model version (swapped in without a restart)
 LOG_FILE = 'positions_logs.csv'
-
-# Initialize Client
-client = Client(RPC_URL)
+# AI agent ⚡ boost lookups after every buy, in the background (stored in the position, alert on Telegram if > 0)
+BOOST_LOOKUPS = False
+BOOST_DEADLINE = 30   # seconds before a lookup is given up
+BOOST_IN_FLIGHT = 2   # agent calls at the same time
+BOOST_TTL = 600       # seconds the boosts of a pool are reused
+# Latency metrics: Prometheus endpoint on localhost (0 disables it) and summary line in the output
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+METRICS_SUMMARY_INTERVAL = 60
+
+# Solana RPC Client, built on first use (every RPC call is timed as rpc_seconds{method=...} and paced by
+# rate_governor, a 429/5xx from the node backs the RPC host off)
+def build_client():
+    from solana.rpc.api import Client
+    return rate_governor.GovernedProxy(metrics.TimedProxy(Client(RPC_URL), "rpc_seconds"), RPC_URL)
+client = Lazy("rpc_client", build_client)
+# Positions are shared by the execute workers and the monitor task
+positions_lock = threading.RLock()
+# Worker threads of the speculative buys and of the exits, started on first use
+prefetch_executor = Lazy("prefetch_executor", lambda: ThreadPoolExecutor(max_workers=PREFETCH_WORKERS))
+exit_executor = Lazy("exit_executor", lambda: ThreadPoolExecutor(max_workers=EXIT_WORKERS))
+# Pools with an exit in progress and entry prices of the streamed positions
+exiting_pools = set()
+streamed_entries = {}
+exits_lock = threading.Lock()
 
 # --- FUNCTIONS --- #
 # Load my Phantom Wallet
@@ -49,13 +114,31 @@ def load_wallet():
         raise ValueError("❌ PRIVATE_KEY_B64 missing")
     secret_key = base64.b64decode(PRIVATE_KEY_B64)
     return Keypair.from_bytes(secret_key)
-wallet = load_wallet()
+wallet = Lazy("wallet", load_wallet)
 
-# Load RF model
+# Load RF model as a flat-array forest (no DataFrame or sklearn validation on the hot path)
 def load_model():
-    with open(MODEL_PATH, 'rb') as f:
-        return pickle.load(f)
-model = load_model()
+    start = time.perf_counter()
+    if os.path.exists(os.path.join(MAPPED_MODEL_DIR, MANIFEST_FILE)):
+        forest = load_mapped(MAPPED_MODEL_DIR)
+        source = f"{MAPPED_MODEL_DIR} version {forest.manifest['version']} (data {forest.manifest['data_hash']})"
+    elif os.path.exists(FLAT_MODEL_PATH):
+        forest, source = load_forest(FLAT_MODEL_PATH), FLAT_MODEL_PATH
+    else:
+        with open(MODEL_PATH, 'rb') as f:
+            forest, source = FlatForest.from_model(pickle.load(f)), MODEL_PATH
+    print(f"🧠 Model loaded from {source} in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return forest
+model = Lazy("model", load_model)
+
+# New model version published by rf_model.py: used from the next candidate on
+def swap_model(forest):
+    model.set(forest)
+
+# Raw JSON-RPC call to the Solana node (returns the "result" field)
+def rpc_request(method, params):
+    response = rate_governor.post(RPC_URL, json={"jsonrpc": "2.0", "id": 1, "method": method, "params": params})
+    return response.json().get("result")
 
 # SOL Balance
 def get_sol_balance():
@@ -63,52 +146,46 @@ def get_sol_balance():
     return sol_balance.value / 1e9
 
 # --- API CALLS --- #
-# Get New Pools
+# Get New Pools (only the pools listed since the last call, walking more pages during bursts)
+new_pools_poller = NewPoolsPoller(NEW_POOLS_API)
 def fetch_new_pools():
-    response = requests.get(NEW_POOLS_API)
-    if response.status_code == 200:
-        return response.json().get("data", [])
-    return []
-
-# Get Pools Data
-def fetch_pool_data(address):
-    response = requests.get(POOL_DATA_API.format(address))
-    if response.status_code == 200:
-        return response.json().get("data", {})
-    print(f"Error in API request 'Fetch Pool Data': {response.status_code}")
-    return {}
-
-# Get token price
-def fetch_pool_price(address):
-    response = requests.get(POOL_DATA_API.format(address))
-    if response.status_code == 200:
-        price = float(response.json().get("data", {}).get('attributes', {})["base_token_price_usd"])
-        return price
-    print(f"Error in API request 'Fetch Pool Price': {response.status_code}")
-    return 0.0
+    return new_pools_poller.poll()
+
+# Get Pools Data (cached a few seconds, concurrent lookups of the same pool share one request)
+# An empty GeckoPool (NaN liquidity) if the request fails
+def fetch_pool_data(address, fresh=False):
+    def fetch():
+        response = rate_governor.get(POOL_DATA_API.format(address))
+        if response.status_code == 200:
+            return decode_pool(response.content)
+        print(f"Error in API request 'Fetch Pool Data': {response.status_code}")
+        return None
+    return cached("pool", address, fetch, fresh) or GeckoPool(address=address)
 
-# Get Token INFO
+# Get Token INFO (cached, an empty GeckoToken if the request fails)
 def fetch_token_info(token_address):
-    response = requests.get(TOKEN_INFO_API.format(token_address))
-    if response.status_code == 200:
-        return response.json().get("data", {})
-    print(f"Error in API request 'Fetch Token Info': {response.status_code}")
-    return {}
+    def fetch():
+        response = rate_governor.get(TOKEN_INFO_API.format(token_address))
+        if response.status_code == 200:
+            return decode_token(response.content)
+        print(f"Error in API request 'Fetch Token Info': {response.status_code}")
+        return None
+    return cached("token_info", token_address, fetch) or GeckoToken()
      
 # Send messages on Telegram
 def send_telegram_message(address, boost):
     message = f"{int(boost)}⚡: {address}"
     payload = {"chat_id": TELEGRAM_CHANNEL, "text": message}
-    response = requests.post(TELEGRAM_API_URL, json=payload)
+    response = rate_governor.post(TELEGRAM_API_URL, json=payload)
     if response.status_code != 200:
         print(f"Error sending Telegram message: {response.text}")    
 
 # === MANAGE SWAP & TRADES === #
-# Get swap tx on Jupiter
-def get_jupiter_swap_tx(input_mint, output_mint, amount):
+# Get a quote on Jupiter
+def get_jupiter_quote(input_mint, output_mint, amount):
     try:
         # 1. Get quotes from the new Quote API
-        quote_url = "https://lite-api.jup.ag/swap/v1/quote"
+        quote_url = JUPITER_QUOTE_API
         quote_params = {
             "inputMint": input_mint,
             "outputMint": output_mint,
@@ -117,18 +194,26 @@ def get_jupiter_swap_tx(input_mint, output_mint, amount):
             "swapMode": "ExactIn",
             "restrictIntermediateTokens": "true"
         }
-        quote_response = requests.get(quote_url, params=quote_params)
+        with metrics.timed("stage_seconds", stage="jupiter_quote"):
+            quote_response = rate_governor.get(quote_url, params=quote_params)
         if quote_response.status_code != 200:
             print(f"❌ Error in Jupiter quote: {quote_response.status_code}")
             print(quote_response.text)
             return None
         # Data structure for tx parameters
-        quote_data = quote_response.json() 
+        return quote_response.json() 
+    except Exception as e:
+        print(f"❌ Error during Jupiter quote request: {e}")
+        return None
+
+# Build the swap tx on Jupiter from a quote
+def build_jupiter_swap(quote_data):
+    try:
         # Extract SOL in output
         sol_out = float(quote_data["outAmount"]) / 1e9  # from lamport to SOL
 
         # 2. Build transaction using the quote just obtained
-        swap_url = "https://lite-api.jup.ag/swap/v1/swap"
+        swap_url = JUPITER_SWAP_API
         payload = {
             "userPublicKey": str(wallet.pubkey()),
             "quoteResponse": quote_data,
@@ -146,7 +231,8 @@ def get_jupiter_swap_tx(input_mint, output_mint, amount):
             "Content-Type": "application/json",
             'Accept': 'application/json'
         }
-        swap_response = requests.post(swap_url, json=payload, headers=headers)
+        with metrics.timed("stage_seconds", stage="jupiter_swap"):
+            swap_response = rate_governor.post(swap_url, json=payload, headers=headers)
 
         if swap_response.status_code == 200:
             result = swap_response.json()
@@ -160,27 +246,59 @@ def get_jupiter_swap_tx(input_mint, output_mint, amount):
     except Exception as e:
         print(f"❌ Error during Jupiter swap request: {e}")
 
-    return None
+    return None, None
+
+# Get swap tx on Jupiter
+def get_jupiter_swap_tx(input_mint, output_mint, amount):
+    quote_data = get_jupiter_quote(input_mint, output_mint, amount)
+    if quote_data is None:
+        return None, None
+    return build_jupiter_swap(quote_data)
+
+# Speculative buy: SOL balance, quote and (optionally) swap tx requested while the candidate is still scored
+def prefetch_buy(input_mint, output_mint):
+    amount = int(INVESTMENT_AMOUNT_SOL * 1e9)
+    prefetched = {"sol_balance": get_sol_balance(), "quote": get_jupiter_quote(input_mint, output_mint, amount), "swap": None}
+    if prefetched["quote"] is not None and PREFETCH_SWAP_TX:
+        prefetched["swap"] = build_jupiter_swap(prefetched["quote"])
+    prefetched["fetched_at"] = time.time()
+    return prefetched
+
+# Get the result of a prefetch if it is still fresh (None otherwise)
+def take_prefetched(future):
+    if future is None:
+        return None
+    try:
+        prefetched = future.result(timeout=QUOTE_TTL)
+    except Exception as e:
+        print(f"⚠️ Prefetch not available: {e}")
+        return None
+    if prefetched["quote"] is None or time.time() - prefetched["fetched_at"] > QUOTE_TTL:
+        print("⚠️ Prefetched quote is stale, requesting a new one")
+        return None
+    return prefetched
 
 # Build full tx on Solana
 def execute_swap(transaction):
     try:
-        # 1. Convert from Serialized base64 → Serialized Uint8array (binary buffer) format
-        tx_bytes = base64.b64decode(transaction['swapTransaction'])
+        with metrics.timed("stage_seconds", stage="sign"):
+            # 1. Convert from Serialized base64 → Serialized Uint8array (binary buffer) format
+            tx_bytes = base64.b64decode(transaction['swapTransaction'])
 
-        # 2. Deserialize the versioned transaction
-        tx_des = VersionedTransaction.from_bytes(tx_bytes)
+            # 2. Deserialize the versioned transaction
+            tx_des = VersionedTransaction.from_bytes(tx_bytes)
  
-        # 3. Sign the transaction
-        signature = wallet.sign_message(message.to_bytes_versioned(tx_des.message)) 
-        signed_tx = VersionedTransaction.populate(tx_des.message,[signature]) 
+            # 3. Sign the transaction
+            signature = wallet.sign_message(message.to_bytes_versioned(tx_des.message)) 
+            signed_tx = VersionedTransaction.populate(tx_des.message,[signature]) 
 
-        # 4. Serialize for sending (Uint8Array → bytes)
-        serialized_tx = bytes(signed_tx)    
+            # 4. Serialize for sending (Uint8Array → bytes)
+            serialized_tx = bytes(signed_tx)    
 
         # 5. Send transaction to the network
         opts = TxOpts(skip_preflight=False, preflight_commitment=Processed)
-        result = client.send_raw_transaction(txn=serialized_tx, opts=opts)
+        with metrics.timed("stage_seconds", stage="send_transaction"):
+            result = client.send_raw_transaction(txn=serialized_tx, opts=opts)
 
         # Store transaction id
         tx_id = json.loads(result.to_json())['result']
@@ -191,86 +309,214 @@ def execute_swap(transaction):
         print(f"❌ Transaction Error: {e}")
         return None
 
-# Get token balance
-def get_token_balance(token_mint):
-    try: 
-        mint = Pubkey.from_string(token_mint)
-        owner = Pubkey.from_string("58LReYgZ56SYpaMLrEEob2fMHxecYguZ6FRHkYN73PSR")
-        token_accounts = client.get_token_accounts_by_owner(owner, TokenAccountOpts(mint=mint))
-        token_account_pubkey = token_accounts.value[0].pubkey
-
-        # Return 0 if no tokens present
-        if not token_account_pubkey:
-            return 0.0
-        
-        # Get token balance amount
-        balance = client.get_token_account_balance(token_account_pubkey)
-        return balance.value.ui_amount
-    
-    except Exception as e:
-        print(f"❌ Error retrieving balance for {token_mint}: {e}")
-        return 0.0
+# Token accounts of a position (derived at buy time, derived again for older positions)
+def position_token_accounts(data):
+    return data.get("token_accounts") or derive_token_accounts(wallet.pubkey(), data["output_mint"])
 
-# Buy tokens
-def buy_token(pool_address, input_mint, output_mint, price0):
-    sol_balance = get_sol_balance()
+# Raw token balances of many positions with a single getMultipleAccounts call ({pool: amount})
+def get_token_balances(positions):
+    try:
+        accounts = [account for data in positions.values() for account in position_token_accounts(data)]
+        balances = fetch_token_balances(client, accounts)
+    except Exception as e:
+        print(f"❌ Error retrieving token balances: {e}")
+        return {}
+    return {pool_address: sum(balances.get(account, 0) for account in position_token_accounts(data))
+            for pool_address, data in positions.items()}
+
+# Buy tokens (using the prefetched balance, quote and swap tx when they are fresh)
+# Returns the tx id of the buy, None if it was not sent
+def buy_token(pool_address, input_mint, output_mint, price0, prefetched=None):
+    sol_balance = prefetched["sol_balance"] if prefetched else get_sol_balance()
     if sol_balance >= INVESTMENT_AMOUNT_SOL:
         amount = int(INVESTMENT_AMOUNT_SOL * 1e9)
         print(f"🪙  SOL → {output_mint} - Pool: {pool_address}")
-        swap_tx, sol_out = get_jupiter_swap_tx(input_mint, output_mint, amount)
+        if prefetched and prefetched["swap"] and prefetched["swap"][0]:
+            swap_tx, sol_out = prefetched["swap"]
+        elif prefetched:
+            swap_tx, sol_out = build_jupiter_swap(prefetched["quote"])
+        else:
+            swap_tx, sol_out = get_jupiter_swap_tx(input_mint, output_mint, amount)
         if swap_tx:
             tx_id = execute_swap(swap_tx)
-            positions = load_positions()
-            positions[pool_address] = {
-                "output_mint": output_mint,
-                "entry_price": price0,
-                "tx_id": tx_id,
-                "timestamp": datetime.now(timezone.utc).isoformat()
-            }
-            save_positions(positions)
+            if tx_id is None:
+                print(f"❌ Buy transaction not sent for {pool_address}.")
+                return
+            # The position stays pending until the confirmation tracker sees the tx landed
+            with positions_lock:
+                positions = load_positions()
+                positions[pool_address] = {
+                    "output_mint": output_mint,
+                    "token_accounts": derive_token_accounts(wallet.pubkey(), output_mint),
+                    "entry_price": price0,
+                    "tx_id": tx_id,
+                    "status": "pending",
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                }
+                save_positions(positions)
+            tracker.track(tx_id, {"type": "buy", "pool": pool_address})
+            return tx_id
         else:
             print(f"❌ Error retrieving swap transaction for {pool_address}.")
     else:
         print("❌ You don't have enough SOL")
 
-# Sell tokens
-def sell_token(pool_address, token_mint):
-    amount = get_token_balance(token_mint)
-    amount = int(amount) * 1000000
+# Sell the raw token amount (the position is closed and logged once the tx is confirmed)
+def sell_token(pool_address, token_mint, amount, attempt=1):
     print(f"🪙  {token_mint} → SOL - Pool: {pool_address}")
     if amount > 0:
-        swap_tx, sol_out = get_jupiter_swap_tx(token_mint, "So11111111111111111111111111111111111111112", amount)
+        swap_tx, sol_out = get_jupiter_swap_tx(token_mint, WSOL_MINT, amount)
         if swap_tx:
             # Execute swap
             tx_id = execute_swap(swap_tx)
-            # Position log
-            log_investment(pool_address, token_mint, tx_id, sol_out=sol_out)
+            if tx_id is None:
+                print("❌ Sell transaction not sent, retrying on next check")
+                return
+            update_position(pool_address, status="exiting", exit_tx=tx_id, exit_sol_out=sol_out, exit_attempts=attempt)
+            tracker.track(tx_id, {"type": "sell", "pool": pool_address, "token_mint": token_mint,
+                                  "sol_out": sol_out, "attempt": attempt})
         else:
             print("❌ Error during token sale")
     else:
         print(f"⚠️ No tokens to sell found for {token_mint}.")
+        remove_position(pool_address)
+
+# Confirmed tx: the buy is open, the sell is logged and closed
+def on_tx_confirmed(tx_id, context):
+    if context["type"] == "buy":
+        print(f"✅ Buy confirmed: https://solscan.io/tx/{tx_id}")
+        update_position(context["pool"], status="confirmed")
+        with positions_lock:
+            position = load_positions().get(context["pool"])
+        # resolve_pool makes RPC calls: done in an exit worker, the confirmation ticks go on meanwhile
+        if position:
+            exit_executor.submit(watch_position, context["pool"], position["entry_price"])
+    else:
+        print(f"✅ Sell confirmed: https://solscan.io/tx/{tx_id}")
+        # Position log
+        log_investment(context["pool"], context["token_mint"], tx_id, sol_out=context["sol_out"])
+        remove_position(context["pool"])
+
+# Failed tx: the buy never happened, the sell is re-quoted and resent until MAX_EXIT_ATTEMPTS
+def on_tx_failed(tx_id, context, reason):
+    print(f"❌ {context['type'].capitalize()} failed ({reason}): https://solscan.io/tx/{tx_id}")
+    if context["type"] == "buy":
+        remove_position(context["pool"])
+        return
+    attempts = context["attempt"]
+    if attempts >= MAX_EXIT_ATTEMPTS:
+        # Terminal state: no automatic sell any more, the position is kept for a manual exit
+        update_position(context["pool"], status="exit_failed", exit_attempts=attempts)
+        stop_watching(context["pool"])
+        metrics.increment("exits_abandoned_total")
+        print(f"🛑 Exit of {context['pool']} failed {attempts} times: position marked 'exit_failed', sell it manually")
+        return
+    # Back to confirmed with the attempts made so far; the resend runs in an exit worker, so a slow
+    # Jupiter or RPC call never holds the confirmation ticks
+    update_position(context["pool"], status="confirmed", exit_attempts=attempts)
+    exit_executor.submit(exit_positions, [context["pool"]])
+
+tracker = Lazy("confirmation_tracker", lambda: ConfirmationTracker(client, on_tx_confirmed, on_tx_failed))
+
+# Transactions still in flight when the bot stopped: pending buys and exits are tracked again
+def recover_transactions():
+    with positions_lock:
+        positions = load_positions()
+    for pool_address, data in positions.items():
+        status = data.get('status', 'confirmed')
+        if status == 'pending' and data.get('tx_id'):
+            tracker.track(data['tx_id'], {"type": "buy", "pool": pool_address}, history=True)
+        elif status == 'exiting' and data.get('exit_tx'):
+            tracker.track(data['exit_tx'], {"type": "sell", "pool": pool_address, "token_mint": data['output_mint'],
+                                            "sol_out": data.get('exit_sol_out'), "attempt": data.get('exit_attempts', 1)},
+                          history=True)
+        else:
+            continue
+        print(f"🔄 {status.capitalize()} transaction of {pool_address} tracked again")
+
+# Exit rule: sell at 2x or at -51%
+def exit_reason(entry_price, current_price):
+    if current_price >= 2 * entry_price:
+        return "🚀 You did a 2x! 😎 "
+    if current_price <= 0.49 * entry_price:
+        return "👎 Ooh no! -51% on bet 😪"
+    return None
 
-# Manage open positions
+# Sell the positions that crossed a threshold (each pool is exited by one caller at a time)
+def exit_positions(pool_addresses):
+    with exits_lock:
+        pool_addresses = [address for address in pool_addresses if address not in exiting_pools]
+        exiting_pools.update(pool_addresses)
+    try:
+        # Skip positions whose exit was sent meanwhile by the monitor or the price feed
+        with positions_lock:
+            positions = load_positions()
+        exits = {address: positions[address] for address in pool_addresses
+                 if address in positions and positions[address].get('status', 'confirmed') == 'confirmed'}
+        # One getMultipleAccounts call for the balances of all the positions to sell
+        balances = get_token_balances(exits) if exits else {}
+        for pool_address, data in exits.items():
+            if pool_address in balances:
+                sell_token(pool_address, data['output_mint'], balances[pool_address],
+                           attempt=data.get('exit_attempts', 0) + 1)
+    finally:
+        with exits_lock:
+            exiting_pools.difference_update(pool_addresses)
+
+# Manage open positions (polling fallback of the streaming price feed)
 def check_investments():
-    positions = load_positions()
-    updated_positions = {}
+    with positions_lock:
+        positions = load_positions()
+    # Only confirmed positions can be sold: pending buys and exits in flight are skipped
+    positions = {address: data for address, data in positions.items() if data.get('status', 'confirmed') == 'confirmed'}
+    # One multi-pool request for all open positions
+    pools_data = fetch_pools_multi(list(positions))
+    exits = []
 
     for pool_address, data in positions.items():
         entry_price = data['entry_price']     
-        time.sleep(1)   
-        current_price = fetch_pool_price(pool_address)
-
-        if current_price >= 2 * entry_price:
-            print(f"🚀 You did a 2x! 😎 ")
-            sell_token(pool_address, data['output_mint'])
-            print(f'current price = {current_price}')
-        elif current_price <= 0.49 * entry_price:
-            print(f"👎 Ooh no! -51% on bet 😪")
-            sell_token(pool_address, data['output_mint'])
+        current_price = pool_price(pools_data.get(pool_address))
+        # SOL price used by the price feed to convert reserves into USD
+        quote_price = pool_price(pools_data.get(pool_address), "quote_price")
+        if quote_price and STREAM_PRICES:
+            price_feed.set_quote_price(quote_price)
+
+        # Keep the position if its price is not available in this pass
+        if current_price is None:
+            continue
+        reason = exit_reason(entry_price, current_price)
+        if reason:
+            print(reason)
             print(f'current price = {current_price}')
-        else:
-            updated_positions[pool_address] = data
-    save_positions(updated_positions)
+            exits.append(pool_address)
+
+    if exits:
+        exit_positions(exits)
+
+# Stream the price of a confirmed position from its pool reserves
+def watch_position(pool_address, entry_price):
+    if not STREAM_PRICES:
+        return
+    with exits_lock:
+        streamed_entries[pool_address] = entry_price
+    try:
+        price_feed.watch(pool_address)
+    except Exception as e:
+        print(f"❌ Price feed not available for {pool_address}: {e}")
+
+# Price tick from the feed: the exit runs in a worker, the feed loop is never blocked
+def on_price_tick(pool_address, price_usd):
+    with exits_lock:
+        entry_price = streamed_entries.get(pool_address)
+        if entry_price is None or pool_address in exiting_pools:
+            return
+    reason = exit_reason(entry_price, price_usd)
+    if reason:
+        print(f"{reason} (on-chain price = {price_usd})")
+        exit_executor.submit(exit_positions, [pool_address])
+
+# Built on first use (it creates its own event loop)
+price_feed = Lazy("price_feed", lambda: PoolPriceFeed(RPC_WS_URL, client, on_price_tick))
 
 # === LOG SETUP === #
 # Load open positions in json file
@@ -285,6 +531,31 @@ def save_positions(data):
     with open(POSITIONS_FILE, 'w') as f:
         json.dump(data, f, indent=2)
 
+# Change some fields of an open position (ignored if it was closed meanwhile, returns False then)
+def update_position(pool_address, **changes):
+    with positions_lock:
+        positions = load_positions()
+        if pool_address not in positions:
+            return False
+        positions[pool_address].update(changes)
+        save_positions(positions)
+        return True
+
+# Close a position
+def remove_position(pool_address):
+    with positions_lock:
+        positions = load_positions()
+        if positions.pop(pool_address, None) is not None:
+            save_positions(positions)
+    stop_watching(pool_address)
+
+# Stop streaming the price of a position
+def stop_watching(pool_address):
+    with exits_lock:
+        streamed = streamed_entries.pop(pool_address, None) is not None
+    if streamed:
+        price_feed.unwatch(pool_address)
+
 # Initialize csv file for order logs
 FIELDNAMES = ["pool", "token", "timestamp", "tx", "sol_out"]
 def initialize_log_file():
@@ -308,109 +579,195 @@ def log_investment(address, output_mint, tx_id, sol_out=None):
             "sol_out": sol_out if sol_out is not None else ""
         })
 
-# --- MAIN --- #
-def main():
-    print("🤖 Running the trading bot on Solana...")
-    processed_pools = set()
-
+# === PIPELINE STAGES === #
+# Pools already sent to the pipeline by any discovery source
+processed_pools = set()
+discovery_lock = threading.Lock()
+
+# Send a new pool to the enrich stage (once, whichever source sees it first)
+def submit_candidate(enrich_queue, pool, detected_at, source):
+    address = pool.address
+    with discovery_lock:
+        if address in processed_pools:
+            return
+        processed_pools.add(address)
+    enrich_queue.put({"address": address, "pool": pool, "detected_at": detected_at, "source": source,
+                      "enrich_queue": enrich_queue, "enrich_retries": 0})
+
+# Send a candidate to the enrich stage again after ENRICH_RETRY_DELAY, from a timer thread: the enrich
+# workers never sleep waiting for GeckoTerminal to index a pool
+def enrich_later(candidate):
+    candidate["enrich_retries"] += 1
+    timer = threading.Timer(ENRICH_RETRY_DELAY, candidate["enrich_queue"].put, args=(candidate,))
+    timer.daemon = True
+    timer.start()
+
+# Discovery: push new PumpSwap pools that pass condition 1 to the enrich stage
+def discover_pools(enrich_queue):
     while True:
-        new_pools = fetch_new_pools()
+        try:
+            new_pools = fetch_new_pools()
+        except requests.RequestException as e:
+            # GeckoTerminal still failing after the retries: try again on the next poll
+            print(f"❌ Error in 'Fetch New Pools': {e}")
+            new_pools = []
         for pool in new_pools:
-            # New pools data
-            address = pool['attributes']['address']
-            dex = pool['relationships']['dex']['data']['id'].lower()
-            # Handle None values
-            try: 
-                liquidity = float(pool['attributes']['reserve_in_usd'])   
-            except (TypeError, ValueError):
-                print(f"Error in liquidity parsing")
-                liquidity = float('nan')
+            # New pools data (missing liquidity is NaN and fails condition 1)
+            address = pool.address
             
+            # Pools not liquid enough yet are returned again by the poller with their new data
+            if pool.liquidity > LIQUIDITY_THRESHOLD or pool.dex not in DEXES:
+                new_pools_poller.accept(address)
+
             # --- CONDITION 1 --- #
-            if liquidity > LIQUIDITY_THRESHOLD and address not in processed_pools and dex in ('pumpswap'):                
-                check_investments()
-                processed_pools.add(address)
-                time.sleep(12) # API timeout error handling
-                # Get pool data
-                try:    
-                    pool_data = fetch_pool_data(address)
-                    pool_attributes = pool_data.get('attributes', {})
-                    raw_lock = pool_attributes.get('locked_liquidity_percentage')
-                    lock = float(raw_lock) if raw_lock is not None else 0.0  
-                    liquidity_2 = float(pool_attributes.get('reserve_in_usd')) 
-                except Exception as e:
-                    print(f"Error in 'Fetch Pool Data': {e}")
-                    lock = float('nan')
-                    liquidity_2 = float('nan')
-
-                # --- CONDITION 2 --- #
-                if liquidity_2 > LIQUIDITY_THRESHOLD and lock > LOCKED_LIQUIDITY_THRESHOLD:                    
-                    try:
-                        volume = float(pool_attributes['volume_usd'].get('h24'))
-                        fdv = float(pool_attributes.get('fdv_usd'))
-                    except Exception as e:
-                        print(f"Error in parsing volume and/or fdv: {e}")
-                        volume, fdv = float('nan'), float('nan')
-
-                    price0 = float(pool_attributes['base_token_price_usd'])
-                    buys = pool_attributes['transactions']['h24'].get('buys') or 0
-                    sells = pool_attributes['transactions']['h24'].get('sells') or 0
-                    b_s = (buys/(buys+sells)) if buys > 0 else float('nan')
-                    v_mc = (volume/fdv) if volume > 0 and fdv > 0 else float('nan')
-                    token_address = pool['relationships']['base_token']['data']['id'].replace('solana_', '')
-                    time.sleep(1) 
-                    # try-except block to handle fetch_token_info 404 API error
-                    try:
-                        token_info = fetch_token_info(token_address)
-                        attributes = token_info.get('attributes', {})
-                        holders_data = attributes.get('holders', {})
-                        holders = holders_data.get('count') or 0 # get number of token holders
-                        top_10_dist = 0 # get top 10 dist percentage
-                        if holders_data.get('distribution_percentage') and holders_data['distribution_percentage'].get('top_10') is not None:
-                            top_10_dist = float(holders_data['distribution_percentage']['top_10'])
-                        twitter = 1 if attributes.get('twitter_handle') else 0 # dummy for existing X profile
-
-                    except Exception as e:
-                        print(f"Errore in 'Fetch Token Info': {e}")
-                        holders = float('nan')
-                        top_10_dist = float('nan')
-                        twitter = float('nan')               
-                
-                    data = {
-                        'liquidity': [liquidity_2],
-                        'volume': [volume],
-                        'market_cap': [fdv],
-                        'holders': [holders],
-                        'top_10': [top_10_dist],
-                        'twitter': [twitter],
-                        'b/s': [b_s],
-                        'v/mc': [v_mc], 
-                        'price0':  [price0]                          
-                    }
-                    
-                    features = pd.DataFrame(data) # Extract features
-
-                    # Model prediction 
-                    if features is not None: # Error Handling if None values are present in features   
-                        y = model.predict(features)
-                        print(y[0])            
-                        if y[0] == 1:
-                            input_mint = "So11111111111111111111111111111111111111112" # wSOL address
-                            output_mint = pool.get("relationships", {}).get("base_token", {}).get("data", {}).get("id", "").replace("solana_", "")
-                            buy_token(address, input_mint, output_mint, price0)
-                            print(f'entry price = {price0}')                
-                            # AI Agent checking for boosts ⚡
-                            # boost = get_boosts(address)
-                            # if int(boost) > 0:                       
-                            #     send_telegram_message(address, boost)
-                    else:
-                        print('features are None')   
-
-                    time.sleep(1)
-                    check_investments() 
-
-        time.sleep(2)
-        check_investments()
+            if pool.liquidity > LIQUIDITY_THRESHOLD and address not in processed_pools and pool.dex in DEXES:                
+                submit_candidate(enrich_queue, pool, time.time(), "geckoterminal")
+
+        time.sleep(POLL_INTERVAL)
+
+# Enrich: get pool data and token info, apply condition 2 and extract the features
+def enrich_candidate(candidate):
+    address = candidate["address"]
+    pool = candidate["pool"]
+    # Get pool data (not from the cache when the pool was not indexed yet on the previous try)
+    try:    
+        with metrics.timed("stage_seconds", stage="fetch_pool_data"):
+            pool_data = fetch_pool_data(address, fresh=candidate["enrich_retries"] > 0)
+    except Exception as e:
+        print(f"Error in 'Fetch Pool Data': {e}")
+        pool_data = GeckoPool(address=address)
+    # Pools seen on-chain first may not be indexed by GeckoTerminal yet: enriched again a bit later
+    if math.isnan(pool_data.liquidity) and candidate["source"] == "logs" and candidate["enrich_retries"] < ENRICH_RETRIES:
+        enrich_later(candidate)
+        return None
+    liquidity_2, lock = pool_liquidity_lock(pool_data)
+
+    # --- CONDITION 2 --- #
+    if not (liquidity_2 > LIQUIDITY_THRESHOLD and lock > LOCKED_LIQUIDITY_THRESHOLD):
+        return None
+
+    # Start the speculative buy while token info is fetched and the model scores the candidate
+    candidate["output_mint"] = pool.base_token
+    candidate["prefetch"] = prefetch_executor.submit(prefetch_buy, WSOL_MINT, candidate["output_mint"])
+
+    token_address = candidate["output_mint"]
+    # try-except block to handle fetch_token_info 404 API error
+    try:
+        with metrics.timed("stage_seconds", stage="fetch_token_info"):
+            token_info = fetch_token_info(token_address)
+    except Exception as e:
+        print(f"Errore in 'Fetch Token Info': {e}")
+        token_info = None
+
+    # Same parsing as the dataset rows the model was trained on
+    candidate["features"] = parse_features(pool_data, token_info)
+    candidate["price0"] = candidate["features"]["price0"]
+    if not candidate["price0"] > 0:
+        candidate["prefetch"].cancel()
+        return None
+    return candidate
+
+# Score: model prediction, only positive candidates go to the execute stage
+def score_candidate(candidate):
+    forest = model.get() # the same version for the whole candidate, even if a new one is swapped in meanwhile
+    with metrics.timed("stage_seconds", stage="predict"):
+        y = forest.predict(feature_vector(candidate["features"], forest.feature_names)) # features in training order
+    print(y[0])            
+    if y[0] != 1:
+        candidate["prefetch"].cancel()
+        return None
+    return candidate
+
+# Execute: buy the token
+def execute_candidate(candidate):
+    prefetched = take_prefetched(candidate["prefetch"])
+    tx_id = buy_token(candidate["address"], WSOL_MINT, candidate["output_mint"], candidate["price0"], prefetched)
+    print(f'entry price = {candidate["price0"]}')                
+    detection_to_send = time.time() - candidate['detected_at']
+    metrics.observe("detection_to_send_seconds", detection_to_send, source=candidate["source"])
+    print(f"⏱️  Detection to send: {detection_to_send:.2f}s")
+    # AI Agent checking for boosts ⚡ of the new position (answered later by on_boosts), only if the buy was sent
+    if BOOST_LOOKUPS and tx_id is not None:
+        boost_service.request(candidate["address"])
+    return None
+
+# Boosts of a bought pool: kept in its position and pushed to Telegram (not if the buy failed meanwhile)
+def on_boosts(address, boosts):
+    if update_position(address, boosts=boosts) and boosts > 0:
+        send_telegram_message(address, boosts)
+
+# Built on the first lookup (it creates its own event loop and thread pools)
+def build_boost_service():
+    return BoostService(lambda address: get_boosts(address, timeout=BOOST_DEADLINE), on_boosts,
+                        deadline=BOOST_DEADLINE, max_in_flight=BOOST_IN_FLIGHT, ttl=BOOST_TTL)
+boost_service = Lazy("boost_service", build_boost_service)
+
+# Run a stage on every item of its bounded queue and pass the results to the next one
+def run_stage(stage, inbox, outbox=None):
+    while True:
+        item = inbox.get()
+        start = time.perf_counter()
+        try:
+            result = stage(item)
+        except Exception as e:
+            print(f"❌ Error in stage '{stage.__name__}': {e}")
+            result = None
+        finally:
+            metrics.observe("pipeline_seconds", time.perf_counter() - start, stage=stage.__name__)
+            inbox.task_done()
+        if result is not None and outbox is not None:
+            outbox.put(result)
+
+# Monitor: check the open positions, independently from the candidates
+def monitor_positions():
+    while True:
+        try:
+            check_investments()
+        except Exception as e:
+            print(f"❌ Error in 'Check Investments': {e}")
+        time.sleep(MONITOR_INTERVAL)
+
+# Start daemon threads running target(*args)
+def start_workers(count, target, *args):
+    for _ in range(count):
+        threading.Thread(target=target, args=args, daemon=True).start()
+
+# --- MAIN --- #
+# Model, wallet and RPC connection built in parallel before the first candidate (a failure stops the bot here)
+def start_up():
+    ready = warm_up({"model": model.get, "wallet": wallet.get, "rpc": get_sol_balance})
+    print(f"💰 SOL balance: {ready['rpc']}")
+
+def main():
+    print("🤖 Running the trading bot on Solana...")
+    start_up()
+    if METRICS_PORT:
+        metrics.start_http_server(METRICS_PORT)
+        print(f"📊 Metrics on http://127.0.0.1:{METRICS_PORT}/metrics")
+    metrics.start_summary(METRICS_SUMMARY_INTERVAL)
+    enrich_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    score_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    execute_queue = queue.Queue(maxsize=QUEUE_SIZE)
+
+    start_workers(ENRICH_WORKERS, run_stage, enrich_candidate, enrich_queue, score_queue)
+    start_workers(SCORE_WORKERS, run_stage, score_candidate, score_queue, execute_queue)
+    start_workers(EXECUTE_WORKERS, run_stage, execute_candidate, execute_queue)
+    start_workers(1, monitor_positions)
+    recover_transactions()
+    tracker.start()
+    # Also started without a mapped model yet: the first one published by rf_model.py is swapped in
+    ModelWatcher(MAPPED_MODEL_DIR, swap_model, MODEL_WATCH_INTERVAL).start()
+    # Condition 1 (liquidity) is checked by the enrich stage for pools detected from logs
+    if LOG_DISCOVERY:
+        LogsDiscovery(RPC_WS_URL, lambda signature: fetch_pool_creation(rpc_request, signature),
+                      lambda pool, detected_at: submit_candidate(enrich_queue, pool, detected_at, "logs")).start()
+    if STREAM_PRICES:
+        price_feed.start()
+        for pool_address, data in load_positions().items():
+            if data.get('status', 'confirmed') == 'confirmed':
+                watch_position(pool_address, data['entry_price'])
+
+    discover_pools(enrich_queue)
 
 
 # --- RUN BOT --- #
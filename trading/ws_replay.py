@@ -0,0 +1,84 @@
+"""
+LOCAL STAND-IN FOR THE SOLANA WEBSOCKET: ANSWERS accountSubscribe / logsSubscribe REQUESTS AND
+REPLAYS RECORDED NOTIFICATIONS (ONE JSON OBJECT PER LINE) TO THE MATCHING SUBSCRIPTIONS
+
+Recording line: {"delay": 0.4, "method": "accountNotification", "key": "<account>", "result": {...}}
+("key" is the subscribed account for accountNotification, the mentioned program for logsNotification)
+
+Run:  python ws_replay.py recording.jsonl 8900   and point RPC_WS_URL to ws://127.0.0.1:8900
+
+Recorded sessions in benchmarks/fixtures (regenerated by python benchmarks/ws_fixtures.py):
+- account_session.jsonl: accountSubscribe updates of the two vaults of a pool whose price doubles
+  (+ price_pool_accounts.json, the accounts read before subscribing); exit latency of the feed vs the
+  GeckoTerminal polling:  python price_feed.py
+- logs_session.jsonl: logsSubscribe notifications of the PumpSwap program (+ pool_creation_txs.json, the
+  getTransaction answers of the creations); time-to-detection:  python pool_discovery.py
+"""
+
+import asyncio
+import itertools
+import json
+import sys
+import time
+import websockets
+
+# Read a recording
+def load_recording(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+# Subscription key of a request (the account or the program mentioned)
+def _subscription_key(method, params):
+    if method == "accountSubscribe":
+        return params[0]
+    if method == "logsSubscribe":
+        mentions = params[0].get("mentions", []) if isinstance(params[0], dict) else []
+        return mentions[0] if mentions else params[0]
+    return None
+
+# Serve the recording to every client; sent_log collects (record, time sent) of every notification
+async def serve_replay(records, host="127.0.0.1", port=8900, sent_log=None):
+    subscription_ids = itertools.count(1)
+
+    async def handler(ws):
+        subscriptions = {} # key -> subscription id
+        subscribed = asyncio.Event()
+
+        async def replay():
+            await subscribed.wait()
+            for record in records:
+                await asyncio.sleep(record.get("delay", 0))
+                subscription = subscriptions.get(record["key"])
+                if subscription is None:
+                    continue # nobody listening, as on the live cluster
+                sent_at = time.time()
+                await ws.send(json.dumps({"jsonrpc": "2.0", "method": record["method"],
+                                          "params": {"result": record["result"], "subscription": subscription}}))
+                if sent_log is not None:
+                    sent_log.append((record, sent_at))
+
+        replay_task = asyncio.ensure_future(replay())
+        try:
+            async for raw in ws:
+                request = json.loads(raw)
+                key = _subscription_key(request["method"], request.get("params", []))
+                if key is not None:
+                    subscriptions[key] = next(subscription_ids)
+                    result = subscriptions[key]
+                    subscribed.set()
+                else:
+                    result = True # unsubscribe
+                await ws.send(json.dumps({"jsonrpc": "2.0", "result": result, "id": request["id"]}))
+        finally:
+            replay_task.cancel()
+
+    return await websockets.serve(handler, host, port)
+
+
+if __name__ == "__main__":
+    records = load_recording(sys.argv[1])
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else 8900
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(serve_replay(records, port=port))
+    print(f"Replaying {len(records)} notifications on ws://127.0.0.1:{port}")
+    loop.run_forever()
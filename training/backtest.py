@@ -0,0 +1,144 @@
+"""
+VECTORIZED BACKTEST OF THE TRADING RULES OVER THE COLLECTED PRICE CHECKPOINTS: ALL POOLS AND A WHOLE
+GRID OF TAKE-PROFIT / STOP-LOSS / MAX HOLD / FEE / POSITION SIZE SETTINGS ARE SIMULATED AT ONCE WITH NUMPY
+
+Run:  python backtest.py dataset.csv [patricio.npz]   (entries = model predictions if a model is given)
+"""
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import itertools
+import os
+import sys
+import time
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+import features
+from features import PRICE_COLUMNS
+
+# Delay of every checkpoint column from price0 (minutes)
+CHECKPOINT_MINUTES = np.array(features.CHECKPOINT_MINUTES)
+
+# Default grid: 16 x 16 x 8 x 3 x 2 = 12,288 configurations
+TAKE_PROFITS = np.round(np.linspace(1.25, 5.0, 16), 3)
+STOP_LOSSES = np.round(np.linspace(0.2, 0.95, 16), 3)
+MAX_HOLDS = np.array([30, 60, 120, 180, 240, 360, 540, 720])  # minutes
+FEES = np.array([0.005, 0.01, 0.02])                           # fee + slippage per side
+POSITION_SIZES = np.array([0.01, 0.05])                         # SOL per trade
+
+# Price ratios to price0 of every pool, ordered by timestamp
+def load_checkpoints(df):
+    df = df.sort_values("timestamp")
+    price0 = pd.to_numeric(df["price0"], errors="coerce").to_numpy(dtype=np.float64)
+    prices = df[PRICE_COLUMNS].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios = prices / price0[:, None]
+    ratios[~(price0 > 0)] = np.nan
+    return df, ratios
+
+# Fill missing checkpoints with the last known ratio (before the first one: NaN)
+def forward_fill(ratios):
+    index = np.where(np.isnan(ratios), 0, np.arange(ratios.shape[1]))
+    np.maximum.accumulate(index, axis=1, out=index)
+    filled = ratios[np.arange(ratios.shape[0])[:, None], index]
+    filled[np.isnan(ratios[:, 0])[:, None] & (index == 0)] = np.nan
+    return filled
+
+# First checkpoint index where hit is True (number of checkpoints if never)
+def first_hit(hit):
+    return np.where(hit.any(axis=-1), hit.argmax(axis=-1), hit.shape[-1])
+
+# Simulate every configuration on the entered pools
+def run_grid(ratios, take_profits=TAKE_PROFITS, stop_losses=STOP_LOSSES, max_holds=MAX_HOLDS,
+             fees=FEES, position_sizes=POSITION_SIZES):
+    filled = forward_fill(ratios)
+    n_checkpoints = ratios.shape[1]
+    # Exit checkpoint of every rule: (T, N), (S, N), (H,)
+    tp_index = first_hit(ratios[None, :, :] >= take_profits[:, None, None])
+    sl_index = first_hit(ratios[None, :, :] <= stop_losses[:, None, None])
+    hold_index = np.searchsorted(CHECKPOINT_MINUTES, max_holds, side="right") - 1
+    rows = np.arange(ratios.shape[0])
+    fee_factor = (1 - fees) ** 2  # entry and exit
+
+    results = []
+    for t, take_profit in enumerate(take_profits):
+        # (S, H, N): the first rule that fires closes the trade
+        exit_index = np.minimum(np.minimum(tp_index[t][None, None, :], sl_index[:, None, :]),
+                                hold_index[None, :, None])
+        exit_index = np.minimum(exit_index, n_checkpoints - 1)
+        exit_ratio = filled[rows[None, None, :], exit_index]
+        # Take profit is filled at the threshold, stop loss and max hold at the observed price
+        exit_ratio = np.where(exit_index == tp_index[t][None, None, :], take_profit, exit_ratio)
+        valid = ~np.isnan(exit_ratio)
+        # (S, H, F, N) net return per trade
+        returns = np.where(valid, exit_ratio, 0)[:, :, None, :] * fee_factor[None, None, :, None] - 1
+        returns = np.where(valid[:, :, None, :], returns, 0)
+
+        trades = valid.sum(axis=-1)[:, :, None]
+        wins = ((returns > 0) & valid[:, :, None, :]).sum(axis=-1)
+        cumulative = np.cumsum(returns, axis=-1)
+        drawdown = (np.maximum.accumulate(cumulative, axis=-1) - cumulative).max(axis=-1)
+        total = cumulative[..., -1] if cumulative.shape[-1] else np.zeros(wins.shape)
+
+        for (s, h, f), size in itertools.product(np.ndindex(*wins.shape), position_sizes):
+            results.append({
+                "take_profit": take_profit, "stop_loss": stop_losses[s], "max_hold_min": max_holds[h],
+                "fee": fees[f], "size_sol": size, "trades": int(trades[s, h, 0]),
+                "hit_rate": wins[s, h, f] / trades[s, h, 0] if trades[s, h, 0] else np.nan,
+                "mean_return": total[s, h, f] / trades[s, h, 0] if trades[s, h, 0] else np.nan,
+                "pnl_sol": total[s, h, f] * size, "max_drawdown_sol": drawdown[s, h, f] * size,
+            })
+    return pd.DataFrame(results)
+
+# Cumulative PnL (SOL) of one configuration, trade by trade
+def pnl_curve(ratios, take_profit, stop_loss, max_hold, fee, size):
+    row = run_single(ratios, take_profit, stop_loss, max_hold, fee)
+    return np.cumsum(row) * size
+
+# Net return of every entered pool for one configuration
+def run_single(ratios, take_profit, stop_loss, max_hold, fee):
+    filled = forward_fill(ratios)
+    tp_index = first_hit(ratios >= take_profit)
+    sl_index = first_hit(ratios <= stop_loss)
+    hold_index = np.searchsorted(CHECKPOINT_MINUTES, max_hold, side="right") - 1
+    exit_index = np.minimum(np.minimum(tp_index, sl_index), hold_index)
+    exit_ratio = filled[np.arange(ratios.shape[0]), exit_index]
+    exit_ratio = np.where(exit_index == tp_index, take_profit, exit_ratio)
+    returns = exit_ratio * (1 - fee) ** 2 - 1
+    return returns[~np.isnan(returns)]
+
+
+if __name__ == "__main__":
+    dataset_path = sys.argv[1] if len(sys.argv) > 1 else "./training/dataset.csv"
+    df, ratios = load_checkpoints(pd.read_csv(dataset_path))
+
+    # Entries: model predictions if a flat model is given, every pool otherwise
+    if len(sys.argv) > 2:
+        from flat_forest import load_forest
+        forest = load_forest(sys.argv[2])
+        entries = forest.predict(df[forest.feature_names].to_numpy(dtype=np.float64)) == 1
+        ratios = ratios[entries]
+    print(f"Backtesting {len(ratios)} entries")
+
+    start = time.perf_counter()
+    results = run_grid(ratios)
+    print(f"{len(results)} configurations simulated in {time.perf_counter() - start:.2f}s")
+
+    # Current bot rule: 2x take profit, -51% stop loss, held until the last checkpoint
+    current = run_single(ratios, 2.0, 0.49, CHECKPOINT_MINUTES[-1], FEES[0])
+    print(f"Current rule (2x / 0.49x): {len(current)} trades, hit rate {np.mean(current > 0):.2%}, "
+          f"mean return {np.mean(current):+.2%}")
+    best = results.sort_values("pnl_sol", ascending=False)
+    print(best.head(10).to_string(index=False))
+
+    # PnL curves: current rule vs best configuration
+    top = best.iloc[0]
+    plt.figure(figsize=(10, 6))
+    plt.plot(np.cumsum(current) * top["size_sol"], label="2x / 0.49x")
+    plt.plot(pnl_curve(ratios, top["take_profit"], top["stop_loss"], top["max_hold_min"], top["fee"], top["size_sol"]),
+             label=f"TP {top['take_profit']}x / SL {top['stop_loss']}x / {top['max_hold_min']}m")
+    plt.xlabel("Trades")
+    plt.ylabel("PnL (SOL)")
+    plt.legend()
+    plt.tight_layout()
+    plt.show()
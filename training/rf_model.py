@@ -1,33 +1,37 @@
 """
 RANDOM FOREST TRAINING & TESTING 
+
+Run:  python rf_model.py [halving|grid|compare]
+halving (default): successive halving over the hyperparameters, growing the forests with warm_start
+grid: exhaustive GridSearchCV | compare: run both and report wall-clock time and F1
 """
 
 # Import libraries
 import pandas as pd
-from sklearn.model_selection import train_test_split, GridSearchCV
+import numpy as np
+from sklearn.model_selection import train_test_split, GridSearchCV, StratifiedKFold
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score
 from sklearn.metrics import precision_score, recall_score, f1_score
 from sklearn.tree import plot_tree
 import matplotlib.pyplot as plt
 import pickle
+import hashlib
+import itertools
+import json
+import math
+import os
+import sys
+import time
+import warnings
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "common"))
+from flat_forest import FlatForest, export_forest
+from model_artifact import FLAT_PATH, MAPPED_DIR, PICKLE_PATH, save_mapped
+from features import FEATURE_NAMES, build_labels
 
-# Load the CSV file
 file_path = "./training/dataset.csv"
-df = pd.read_csv(file_path)
-
-# Missing data cleaning and label processing
-
-# --- RANDOM FOREST MODEL --- #
-# Select features
-X = df.drop(columns=['name', 'address', 'label_2x'])
-label = df['label_2x']
-
-# Split the dataset (80% training, 20% testing)
-X_train, X_test, y_train, y_test = train_test_split(X, label, test_size=0.2, random_state=42)
-
-# Define the RandomForestClassifier
-rf = RandomForestClassifier(random_state=42, class_weight='balanced')
+cache_dir = "./training/cache"
+search_mode = sys.argv[1] if len(sys.argv) > 1 else "halving"
 
 # Define hyperparameters grid for optimization
 param_grid = {
@@ -36,14 +40,154 @@ param_grid = {
     'min_samples_split': [2, 5, 10],
     'min_samples_leaf': [1, 2, 4]
 }
+halving_factor = 3 # keep the best third of the configurations after every tree stage
+
+# --- DATASET & FOLDS CACHE --- #
+# Hash of the dataset file: the cached split, folds and search results are only reused for the same data
+def dataset_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+# Features, train/test split and CV folds (built once per dataset version)
+def load_split(path, data_hash):
+    cache_file = os.path.join(cache_dir, f"{data_hash}.pkl")
+    if os.path.exists(cache_file):
+        with open(cache_file, 'rb') as file:
+            print(f"Split and folds loaded from {cache_file}")
+            return pickle.load(file)
+
+    # Load the CSV file
+    df = pd.read_csv(path)
+
+    # Missing data cleaning and label processing
+    df = df.drop_duplicates(subset='address')
+    if 'label_2x' not in df.columns:
+        df = df.join(build_labels(df))
+    df = df.dropna(subset=['label_2x'])  # pools still being tracked
+
+    # Select features (same order as the bot's model input)
+    X = df[FEATURE_NAMES]
+    label = df['label_2x'].astype(int)
+
+    # Split the dataset (80% training, 20% testing)
+    X_train, X_test, y_train, y_test = train_test_split(X, label, test_size=0.2, random_state=42)
+    folds = list(StratifiedKFold(n_splits=5, shuffle=True, random_state=42).split(X_train, y_train))
+    split = (X_train, X_test, y_train, y_test, folds)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_file, 'wb') as file:
+        pickle.dump(split, file)
+    return split
+
+# Best hyperparameters found by a previous search on the same dataset
+def load_search_result(data_hash, mode):
+    results_file = os.path.join(cache_dir, f"{data_hash}_search.json")
+    if not os.path.exists(results_file):
+        return None
+    with open(results_file) as file:
+        return json.load(file).get(mode)
+
+def save_search_result(data_hash, mode, result):
+    results_file = os.path.join(cache_dir, f"{data_hash}_search.json")
+    results = {}
+    if os.path.exists(results_file):
+        with open(results_file) as file:
+            results = json.load(file)
+    results[mode] = result
+    with open(results_file, 'w') as file:
+        json.dump(results, file, indent=2)
+
+# --- HYPERPARAMETER SEARCH --- #
+# Exhaustive GridSearchCV (refit=True already fits the best estimator on the whole training set)
+def grid_search(X_train, y_train, folds):
+    rf = RandomForestClassifier(random_state=42, class_weight='balanced')
+    rf_grid = GridSearchCV(rf, param_grid, cv=folds, n_jobs=-1, scoring='f1')
+    rf_grid.fit(X_train, y_train)
+    return rf_grid.best_params_, rf_grid.best_score_
+
+# Successive halving: every configuration starts with the smallest forest, the survivors grow more trees
+# on top of the ones already fitted (warm_start) and the best third goes on to the next tree stage.
+# Only the fold forests of the configurations still in the best third are kept in memory
+def halving_search(X_train, y_train, folds):
+    tree_params = {key: values for key, values in param_grid.items() if key != 'n_estimators'}
+    candidates = [dict(zip(tree_params, values)) for values in itertools.product(*tree_params.values())]
+    forests = {}  # configuration -> its fold forests, grown in the previous stage
+    alive = list(range(len(candidates)))
+    best_params, best_score = None, -1
+
+    for stage, n_estimators in enumerate(param_grid['n_estimators']):
+        keep = math.ceil(len(alive) / halving_factor)
+        scores, grown = {}, {}
+        for i in alive:
+            fold_forests = forests.pop(i, None) or [
+                RandomForestClassifier(random_state=42, class_weight='balanced', warm_start=True, n_jobs=-1,
+                                       **candidates[i])
+                for _ in folds
+            ]
+            fold_scores = []
+            for forest, (train_index, val_index) in zip(fold_forests, folds):
+                forest.set_params(n_estimators=n_estimators)
+                # Every fold forest is always grown on the same fold, so the 'balanced' weights stay consistent
+                with warnings.catch_warnings():
+                    warnings.filterwarnings("ignore", message='class_weight presets "balanced"')
+                    forest.fit(X_train.iloc[train_index], y_train.iloc[train_index])
+                fold_scores.append(f1_score(y_train.iloc[val_index], forest.predict(X_train.iloc[val_index])))
+            scores[i] = np.mean(fold_scores)
+            if scores[i] > best_score:
+                best_params, best_score = {**candidates[i], 'n_estimators': n_estimators}, scores[i]
+            # The worst configuration so far is dropped with its forests as soon as more than 'keep' are held
+            grown[i] = fold_forests
+            if len(grown) > keep:
+                del grown[min(grown, key=scores.get)]
+        print(f"Stage {stage + 1}: {len(alive)} configurations x {n_estimators} trees | best F1 {max(scores.values()):.4f}")
+
+        alive = sorted(grown, key=scores.get, reverse=True)
+        forests = grown
+    return best_params, best_score
+
+# Search (or reuse the cached result) and fit the best model once on the whole training set
+def train(mode, X_train, y_train, folds, data_hash):
+    start = time.perf_counter()
+    result = load_search_result(data_hash, mode)
+    if result is None:
+        best_params, cv_score = (grid_search if mode == "grid" else halving_search)(X_train, y_train, folds)
+        result = {'params': best_params, 'cv_f1': cv_score, 'search_seconds': time.perf_counter() - start}
+        save_search_result(data_hash, mode, result)
+    else:
+        print(f"Cached {mode} search result for dataset {data_hash}: {result['params']}")
+
+    model = RandomForestClassifier(random_state=42, class_weight='balanced', n_jobs=-1, **result['params'])
+    model.fit(X_train, y_train)
+    return model, result, time.perf_counter() - start
 
-# Perform GridSearchCV to find the best hyperparameters
-rf_grid = GridSearchCV(rf, param_grid, cv=5, n_jobs=-1, scoring='f1')
-rf_grid.fit(X_train, y_train)
-
-# Train the best model found
-rf_trained = rf_grid.best_estimator_
-rf_trained.fit(X_train, y_train)
+# --- RANDOM FOREST MODEL --- #
+data_hash = dataset_hash(file_path)
+X_train, X_test, y_train, y_test, folds = load_split(file_path, data_hash)
+X = X_train
+
+if search_mode == "compare":
+    # Both searches on the same folds: the halving model is kept only at equal or better CV F1
+    runs = {}
+    for mode in ("grid", "halving"):
+        save_search_result(data_hash, mode, None)  # time the full search, not the cache
+        model, result, seconds = train(mode, X_train, y_train, folds, data_hash)
+        print(f"{mode:>8}: {seconds:8.1f}s | CV F1 {result['cv_f1']:.4f} | "
+              f"test F1 {f1_score(y_test, model.predict(X_test)):.4f} | {result['params']}")
+        runs[mode] = (model, result['cv_f1'], seconds)
+    (grid_model, grid_f1, grid_seconds), (halving_model, halving_f1, halving_seconds) = runs["grid"], runs["halving"]
+    if halving_f1 >= grid_f1:
+        rf_trained = halving_model
+        print(f"Keeping the halving search model: CV F1 {halving_f1:.4f} >= grid {grid_f1:.4f} "
+              f"({halving_seconds:.1f}s vs {grid_seconds:.1f}s)")
+    else:
+        rf_trained = grid_model
+        print(f"Keeping the grid search model: halving CV F1 {halving_f1:.4f} < grid {grid_f1:.4f}")
+else:
+    rf_trained, result, seconds = train(search_mode, X_train, y_train, folds, data_hash)
+    print(f"{search_mode} search: {seconds:.1f}s | CV F1 {result['cv_f1']:.4f} | {result['params']}")
 
 # Make predictions on the test set
 y_pred = rf_trained.predict(X_test)
@@ -81,13 +225,13 @@ plt.show()
 
 # --- PICKEL THE TRAINED MODEL --- #
 # Save the trained model
-def save_model(model, filename="patricio.pkl"):
+def save_model(model, filename=PICKLE_PATH):
     with open(filename, 'wb') as file:
         pickle.dump(model, file)
     print(f"Model saved as {filename}")
 
 # Load the trained model
-def load_model(filename="patricio.pkl"):
+def load_model(filename=PICKLE_PATH):
     with open(filename, 'rb') as file:
         model = pickle.load(file)
     print(f"Model loaded from {filename}")
@@ -95,5 +239,8 @@ def load_model(filename="patricio.pkl"):
 
 # Save the model
 save_model(rf_trained)
+# Export the flat-array versions loaded by the trading bot (a running bot swaps in the mapped one)
+export_forest(rf_trained, FLAT_PATH)
+save_mapped(FlatForest.from_model(rf_trained), MAPPED_DIR, data_hash)
 # Load the model
 rf_trained = load_model()